@@ -25,17 +25,14 @@ bl_info = {
     "category": "Science",
 }
 
-import bpy
-
-from .manager_register import (
-    assert_directory_name, 
-    assert_no_duplicates, 
-    assert_blender_version
-)
-
 
 def register():
-    from .manager_register import register
+    from .manager_register import (
+        register,
+        assert_directory_name, 
+        assert_no_duplicates, 
+        assert_blender_version
+    )
     assert_directory_name()
     assert_no_duplicates()
     assert_blender_version()
@@ -2,8 +2,12 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from .wrap import calculate_crack_thump
-from ..maintenance.debug import debug_main
+import numpy as np
+
+from .ballistics import DEFAULT_AIR_DENSITY_KG_M3, arrival_times_drag, flight_table, predict_delta_ts_drag
+from .batch import aim_directions, predict_arrival_times, predict_delta_ts, residuals
+from .robust import score
+from ..maintenance.profiler import timed
 from .compare import compare
 from .speed_sound import speed_sound
 
@@ -20,22 +24,24 @@ class Algorithm:
     Solution: We must mathematically calculate the mach cone, predict what the crack-thump delay should be, and later check how close the actual
     delay is.
 
+    Inputs: Plain SceneData and Rifle objects, so this runs the same inside and outside Blender. See manager_adapter for the Blender side.
+
     Final Output: We add up all the errors in seconds and return that to the user.
     '''
-    def __init__(self, scene, ao):
+    def __init__(self, scene, rifle):
         self.scene = scene
-        self.rifle = ao
+        self.rifle = rifle
 
-        self.temp_f = scene.calcrack.temp_f
+        self.temp_f = scene.temp_f
         self.speed_sound_mps = speed_sound(self.temp_f)
         self.round_velocity_fps = self.rifle.ammo_speed
-        self.rifle_origin_world = self.rifle.matrix_world.translation.copy()
+        self.rifle_origin_world = np.array(rifle.origin, dtype=np.float64)
         self.bullet_speed_mps = float(self.round_velocity_fps) * FPS_TO_MPS
-        self.rifle_endpoint = ao.aim_target.matrix_world.translation.copy()
-
-        debug_main(self)
+        self.rifle_endpoint = np.array(rifle.endpoint, dtype=np.float64)
+        self.flight_table = get_flight_table(rifle, self.bullet_speed_mps, self.speed_sound_mps) if scene.air_drag else None
 
 
+    @timed("algorithm.execute")
     def execute(self):
         self.get_all_mic_data()
         self.predict_mic_delta_ts()
@@ -43,27 +49,93 @@ class Algorithm:
         return self
     
     def get_all_mic_data(self):
-        all_mics = [
-            obj for obj in self.scene.objects
-            if obj.type == 'CAMERA' and obj.delta_t != 0.0
-        ]
-
-        mic_data = {}
-        for mic in all_mics:
-            mic_position = mic.matrix_world.translation.copy()
-            mic_data[mic.name] = (mic_position, round(mic.delta_t, 3), mic.confidence)
-
-        self.actual = mic_data
+        self.mic_names = self.scene.mic_names
+        self.mic_positions = self.scene.mic_positions
+        self.actual_delta_ts = self.scene.actual_delta_ts
+        self.mic_confidences = self.scene.mic_confidences
     
+    @timed("algorithm.predict_mic_delta_ts")
     def predict_mic_delta_ts(self):
-        predictions = {}
-
-        for mic_name, (mic_position, _, _) in self.actual.items():
-            predictions[mic_name] = calculate_crack_thump(self, mic_position)
+        self.direction = aim_directions(self.rifle_origin_world, self.rifle_endpoint)[0]
+        if self.flight_table is not None:
+            self.predictions = predict_delta_ts_drag(
+                self.mic_positions,
+                self.rifle_origin_world,
+                self.direction,
+                self.flight_table,
+                self.speed_sound_mps
+            )
+            return
 
-        self.predictions = predictions
+        self.predictions = predict_delta_ts(
+            self.mic_positions,
+            self.rifle_origin_world,
+            self.direction,
+            self.bullet_speed_mps,
+            self.speed_sound_mps
+        )[0]
     
+    @timed("algorithm.compare_results")
     def compare_results(self):
         aggr, mean = compare(self)
         self.aggregated_errors = aggr
-        self.mean_error = mean
\ No newline at end of file
+        self.mean_error = mean
+
+    def predict_arrival_times(self):
+        '''
+        When the crack and the thump reach every mic, in seconds after the shot, from the same geometry the
+        simulations animate. Call after execute. Returns (t_crack, t_thump, reached), each (M,).
+        '''
+        if self.flight_table is not None:
+            return arrival_times_drag(
+                self.mic_positions,
+                self.rifle_origin_world,
+                self.direction,
+                self.flight_table,
+                self.speed_sound_mps
+            )
+
+        t_crack, t_thump, reached = predict_arrival_times(
+            self.mic_positions,
+            self.rifle_origin_world,
+            self.direction,
+            self.bullet_speed_mps,
+            self.speed_sound_mps
+        )
+        return t_crack[0], t_thump[0], reached[0]
+
+
+@timed("algorithm.score_rifles")
+def score_rifles(scene, rifles):
+    '''
+    Scores many rifles against the same mics in one batched pass, without an Algorithm per rifle.
+
+    Returns (errors, aggregated_errors, mean_errors) with shapes (N, M), (N,) and (N,).
+    '''
+    origins = np.array([rifle.origin for rifle in rifles], dtype=np.float64).reshape(-1, 3)
+    endpoints = np.array([rifle.endpoint for rifle in rifles], dtype=np.float64).reshape(-1, 3)
+    speeds = np.array([float(rifle.ammo_speed) * FPS_TO_MPS for rifle in rifles], dtype=np.float64)
+    directions = aim_directions(origins, endpoints)
+    speed_sound_mps = speed_sound(scene.temp_f)
+
+    if scene.air_drag:  # Each ammo profile has its own flight table, so this one stays per rifle
+        predictions = np.array([
+            predict_delta_ts_drag(
+                scene.mic_positions,
+                origin,
+                direction,
+                get_flight_table(rifle, speed, speed_sound_mps),
+                speed_sound_mps
+            )
+            for rifle, origin, direction, speed in zip(rifles, origins, directions, speeds)
+        ]).reshape(len(rifles), -1)
+    else:
+        predictions = predict_delta_ts(scene.mic_positions, origins, directions, speeds, speed_sound_mps)
+    errors = residuals(predictions, scene.actual_delta_ts, scene.error_margin)
+    aggregated, mean = score(errors, scene.scoring, scene.robust_scale)
+    return errors, aggregated, mean
+
+
+@timed("algorithm.get_flight_table")
+def get_flight_table(rifle, bullet_speed_mps, speed_sound_mps):
+    return flight_table(rifle.drag_model, rifle.ballistic_coeff, bullet_speed_mps, speed_sound_mps, DEFAULT_AIR_DENSITY_KG_M3)
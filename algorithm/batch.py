@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import numpy as np
+
+
+def aim_directions(origins, endpoints):
+    '''Unit aim vectors, shape (N, 3), from rifle origins toward their aim endpoints.'''
+    origins = np.atleast_2d(np.asarray(origins, dtype=np.float64))
+    endpoints = np.atleast_2d(np.asarray(endpoints, dtype=np.float64))
+    direction = endpoints - origins
+    length = np.linalg.norm(direction, axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(length > 0.0, direction / length, 0.0)
+
+
+def predict_delta_ts(mic_positions, origins, directions, v, c, meters_per_bu=1.0):
+    """
+    Batched version of math.calculate for every (candidate, mic) pair in one pass.
+
+    mic_positions : (M, 3) mic positions
+    origins       : (3,) or (N, 3) rifle origins
+    directions    : (3,) or (N, 3) unit aim vectors
+    v             : scalar or (N,) bullet speed (m/s)
+    c             : scalar or (N,) speed of sound (m/s)
+
+    Returns predicted crack-thump delta-t values, shape (N, M).
+    """
+    x, r, R_mag = mic_geometry(mic_positions, origins, directions, meters_per_bu)
+    v = np.asarray(v, dtype=np.float64).reshape(-1, 1)
+    c = np.asarray(c, dtype=np.float64).reshape(-1, 1)
+
+    return calculate_batch(x, r, R_mag, v, c)
+
+
+def predict_arrival_times(mic_positions, origins, directions, v, c, meters_per_bu=1.0):
+    '''Same inputs as predict_delta_ts. Returns (t_crack, t_thump, reached), each (N, M), in seconds after the shot.'''
+    x, r, R_mag = mic_geometry(mic_positions, origins, directions, meters_per_bu)
+    v = np.asarray(v, dtype=np.float64).reshape(-1, 1)
+    c = np.asarray(c, dtype=np.float64).reshape(-1, 1)
+
+    return arrival_times(x, r, R_mag, v, c)
+
+
+def mic_geometry(mic_positions, origins, directions, meters_per_bu=1.0):
+    '''Distance along the bullet path (x), off the path (r) and straight line (R_mag) to each mic, each (N, M).'''
+    mics = np.asarray(mic_positions, dtype=np.float64).reshape(-1, 3)
+    origins = np.atleast_2d(np.asarray(origins, dtype=np.float64))
+    directions = np.atleast_2d(np.asarray(directions, dtype=np.float64))
+
+    R = (mics[np.newaxis, :, :] - origins[:, np.newaxis, :]) * float(meters_per_bu)
+    R_sq = np.einsum('nmk,nmk->nm', R, R)
+    x = np.einsum('nmk,nk->nm', R, directions)
+    r = np.sqrt(np.maximum(R_sq - x * x, 0.0))  # Same form as grid_search.score_chunk so both agree bit-for-bit
+    return x, r, np.sqrt(R_sq)
+
+
+def calculate_batch(x, r, R_mag, v, c):
+    '''math.calculate over broadcastable arrays. Rows that are subsonic or outside the cone return 0.0.'''
+    t_crack, t_thump, reached = arrival_times(x, r, R_mag, v, c)
+    return np.where(reached, t_thump - t_crack, 0.0)
+
+
+def arrival_times(x, r, R_mag, v, c):
+    '''When the crack and the thump reach each mic, and whether the crack reaches it at all (supersonic and inside the cone).'''
+    t_thump = R_mag / c
+    supersonic = v > c
+    root = np.sqrt(np.where(supersonic, v*v - c*c, 1.0))  # Placeholder root for subsonic rows, masked below
+
+    cot_theta = root / c
+    tan_theta = c / root
+    reached = x >= r * tan_theta
+
+    t_crack = np.maximum((x + r * cot_theta) / v, 0.0)
+
+    return t_crack, t_thump, supersonic & reached
+
+
+def apply_margin_errors(errors, margin):
+    '''If you change this, you MUST update the tooltip for scene Error Margin!!!'''
+    return np.where(np.round(errors, 3) <= margin, 0.0, errors)
+
+
+def residuals(predictions, actual_delta_ts, error_margin):
+    '''Absolute per-mic errors after the error margin, same shape as predictions.'''
+    errors = np.abs(np.asarray(predictions, dtype=np.float64) - np.asarray(actual_delta_ts, dtype=np.float64))
+    return apply_margin_errors(errors, error_margin)
+
+
+def score_errors(errors):
+    '''Aggregated and mean error per candidate, matching compare's rounding. Returns two (N,) arrays.'''
+    errors = np.atleast_2d(errors)
+    sum_errors = np.round(errors.sum(axis=-1), 3)
+    return sum_errors, sum_errors / max(errors.shape[-1], 1)
@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 4096
+POSITION_QUANTUM = 1e-4  # Meters. Closer than this, two rifle or target positions count as the same candidate
+MARGIN_QUANTUM = 1e-6
+
+
+class ResultCache:
+    '''
+    Context: Undo, redo, flipping between candidate rifles and live-update jitter keep asking for results we
+    already computed.
+
+    Solution: A bounded LRU of results keyed on the quantized inputs (see quantize). The least recently used
+    entry is dropped once maxsize is reached. Hits and misses are counted for the UI.
+    '''
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def quantize(values, quantum):
+    return tuple(int(round(value / quantum)) for value in values)
+
+
+def result_key(scene, rifle, mic_hash):
+    '''Everything a Fire result depends on. mic_hash stands in for the mic positions and delta-t values.'''
+    return (
+        quantize(rifle.origin, POSITION_QUANTUM),
+        quantize(rifle.endpoint, POSITION_QUANTUM),
+        rifle.ammo_speed,
+        rifle.drag_model if scene.air_drag else None,
+        round(rifle.ballistic_coeff, 6) if scene.air_drag else None,
+        scene.temp_f,
+        quantize((scene.error_margin,), MARGIN_QUANTUM),
+        scene.scoring,
+        round(scene.robust_scale, 6),
+        mic_hash,
+    )
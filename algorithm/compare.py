@@ -2,33 +2,29 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import bpy
-from ..maintenance.debug import debug_each
+from .batch import residuals
+from .robust import score
+from ..maintenance.log import LOG
 
 
 def compare(Algorithm):
-        scene = bpy.context.scene # Keep these expensive bpy calls outside loop
-        is_printing = scene.calcrack.print_to_terminal
-        error_margin = scene.calcrack.error_margin
+        is_printing = Algorithm.scene.print_to_terminal
+        error_margin = Algorithm.scene.error_margin
 
-        errors = []
-        for mic_name, (_, actual_dt, _) in Algorithm.actual.items():
-            pred_dt = Algorithm.predictions.get(mic_name)
-            if pred_dt is None:
-                continue
-            error = abs(float(pred_dt) - float(actual_dt))
-            error = apply_margin_error(error, error_margin)
-            errors.append(error)
-            if is_printing: debug_each(mic_name, error, actual_dt, pred_dt)
-        
-        sum_errors = round(sum(errors), 3)
-        mean = sum_errors / len(errors)
+        errors = residuals(Algorithm.predictions, Algorithm.actual_delta_ts, error_margin)
+        if is_printing:  # Buffered. LOG prints and writes it from a background thread
+            LOG.add(
+                Algorithm.rifle.name,
+                Algorithm.rifle_origin_world,
+                Algorithm.rifle_endpoint,
+                Algorithm.round_velocity_fps,
+                Algorithm.mic_names,
+                Algorithm.actual_delta_ts,
+                Algorithm.predictions,
+                errors
+            )
 
-        return sum_errors, mean
+        sum_errors, mean = score(errors, Algorithm.scene.scoring, Algorithm.scene.robust_scale)
+        Algorithm.errors = errors
 
-
-def apply_margin_error(error, margin):
-     '''If you change this, you MUST update the tooltip for scene Error Margin!!!'''
-     if round(error, 3) <= margin:
-          return 0.00
-     return error
\ No newline at end of file
+        return float(sum_errors[0]), float(mean[0])
@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .ballistics import DEFAULT_BALLISTIC_COEFF, DEFAULT_DRAG_MODEL
+from .robust import DEFAULT_ROBUST_SCALE, DEFAULT_SCORING
+
+DEFAULT_TEMP_F = 72
+DEFAULT_AMMO_SPEED = 1600
+DEFAULT_CONFIDENCE = 3
+DEFAULT_DURATION_FLIGHT = .5
+
+
+@dataclass
+class Mic:
+    name: str
+    position: tuple
+    delta_t: float
+    confidence: int = DEFAULT_CONFIDENCE
+
+
+@dataclass
+class Rifle:
+    name: str
+    origin: tuple
+    endpoint: tuple
+    ammo_speed: float = DEFAULT_AMMO_SPEED
+    duration_flight: float = DEFAULT_DURATION_FLIGHT
+    drag_model: str = DEFAULT_DRAG_MODEL
+    ballistic_coeff: float = DEFAULT_BALLISTIC_COEFF
+
+
+@dataclass
+class SceneData:
+    '''Scene settings plus every mic as contiguous arrays, which is all the Algorithm reads.'''
+    temp_f: float = DEFAULT_TEMP_F
+    error_margin: float = 0.0
+    print_to_terminal: bool = False
+    air_drag: bool = False
+    scoring: str = DEFAULT_SCORING
+    robust_scale: float = DEFAULT_ROBUST_SCALE
+    mic_names: list = field(default_factory=list)
+    mic_positions: np.ndarray = field(default_factory=lambda: np.empty((0, 3), dtype=np.float64))
+    actual_delta_ts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    mic_confidences: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+
+    @classmethod
+    def from_mics(cls, mics, **settings):
+        '''Mics with a delta_t of 0 are ignored and delta_t is rounded to 3 decimals, same as in Blender.'''
+        mics = [mic for mic in mics if mic.delta_t != 0.0]
+        return cls(
+            mic_names=[mic.name for mic in mics],
+            mic_positions=np.array([mic.position for mic in mics], dtype=np.float64).reshape(-1, 3),
+            actual_delta_ts=np.array([round(mic.delta_t, 3) for mic in mics], dtype=np.float64),
+            mic_confidences=np.array([mic.confidence for mic in mics], dtype=np.int32),
+            **settings
+        )
+
+    def mics(self):
+        return [
+            Mic(name, tuple(position), float(delta_t), int(confidence))
+            for name, position, delta_t, confidence
+            in zip(self.mic_names, self.mic_positions, self.actual_delta_ts, self.mic_confidences)
+        ]
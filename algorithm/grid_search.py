@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import numpy as np
+
+from .batch import calculate_batch, apply_margin_errors
+from .robust import DEFAULT_ROBUST_SCALE, DEFAULT_SCORING, mic_losses
+
+MAX_CHUNK_ELEMENTS = 2 ** 21  # Per-chunk (origin, direction, speed, mic) elements, keeps temporaries near 100 MB
+
+
+def search_origins(bounds_min, bounds_max, cell_size):
+    '''Cell centers filling the search volume. Returns origins (P, 3) and the grid shape (nx, ny, nz).'''
+    bounds_min = np.asarray(bounds_min, dtype=np.float64)
+    bounds_max = np.asarray(bounds_max, dtype=np.float64)
+    extent = np.maximum(bounds_max - bounds_min, 0.0)
+    shape = np.maximum(np.ceil(extent / cell_size).astype(np.int64), 1)
+
+    axes = [
+        bounds_min[i] + (np.arange(shape[i]) + 0.5) * (extent[i] / shape[i])
+        for i in range(3)
+    ]
+    grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1)
+    return grid.reshape(-1, 3), tuple(int(n) for n in shape)
+
+
+def search_directions(azimuth_steps, elevation_min, elevation_max, elevation_steps):
+    '''Unit aim vectors (D, 3) for every azimuth/elevation pair, angles in radians, Z up.'''
+    azimuths = np.arange(max(1, azimuth_steps)) * (2.0 * np.pi / max(1, azimuth_steps))
+    elevations = np.linspace(elevation_min, elevation_max, max(1, elevation_steps))
+
+    az, el = np.meshgrid(azimuths, elevations, indexing='ij')
+    az, el = az.ravel(), el.ravel()
+    directions = np.stack((np.cos(el) * np.cos(az), np.cos(el) * np.sin(az), np.sin(el)), axis=-1)
+    return directions
+
+
+def grid_search(mic_positions, actual_delta_ts, c, error_margin, origins, directions, speeds_mps, top_n=10,
+                scoring=DEFAULT_SCORING, robust_scale=DEFAULT_ROBUST_SCALE):
+    '''
+    Scores every origin x direction x speed candidate against the mics, with the same scoring mode as Fire.
+
+    Returns (best, min_errors):
+        best       : (K, 4) rows of (summed error, origin index, direction index, speed index), best first
+        min_errors : (P,) smallest summed error found at each origin
+    '''
+    mics = np.asarray(mic_positions, dtype=np.float64).reshape(-1, 3)
+    actual = np.asarray(actual_delta_ts, dtype=np.float64)
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+    speeds = np.asarray(speeds_mps, dtype=np.float64).ravel()
+
+    per_origin = max(1, len(directions) * len(speeds) * len(mics))
+    chunk = max(1, MAX_CHUNK_ELEMENTS // per_origin)
+
+    min_errors = np.empty(len(origins), dtype=np.float64)
+    best = np.empty((0, 4), dtype=np.float64)
+
+    for start in range(0, len(origins), chunk):
+        stop = min(start + chunk, len(origins))
+        sums = score_chunk(mics, actual, c, error_margin, origins[start:stop], directions, speeds, scoring, robust_scale)
+
+        min_errors[start:stop] = sums.reshape(stop - start, -1).min(axis=1)
+        best = merge_best(best, chunk_best(sums, start, top_n), top_n)
+
+    return best, min_errors
+
+
+def score_chunk(mics, actual, c, error_margin, origins, directions, speeds, scoring=DEFAULT_SCORING, robust_scale=DEFAULT_ROBUST_SCALE):
+    '''Summed errors (or robust losses) for a block of origins, shape (P, D, S).'''
+    predictions = predict_chunk(mics, c, origins, directions, speeds)
+    errors = apply_margin_errors(np.abs(predictions - actual), error_margin)
+    return mic_losses(errors, scoring, robust_scale).sum(axis=-1)
+
+
+def predict_chunk(mics, c, origins, directions, speeds):
+    '''Predicted delta-t for a block of origins against every direction, speed and mic, shape (P, D, S, M).'''
+    R = mics[np.newaxis, :, :] - origins[:, np.newaxis, :]                      # (P, M, 3)
+    R_sq = np.einsum('pmk,pmk->pm', R, R)
+    x = np.einsum('pmk,dk->pdm', R, directions)                                  # (P, D, M)
+    r = np.sqrt(np.maximum(R_sq[:, np.newaxis, :] - x * x, 0.0))
+
+    x = x[:, :, np.newaxis, :]                                                   # (P, D, 1, M)
+    r = r[:, :, np.newaxis, :]
+    R_mag = np.sqrt(R_sq)[:, np.newaxis, np.newaxis, :]                          # (P, 1, 1, M)
+    v = speeds[np.newaxis, np.newaxis, :, np.newaxis]                            # (1, 1, S, 1)
+
+    return calculate_batch(x, r, R_mag, v, c)
+
+
+def chunk_best(sums, offset, top_n):
+    '''Top-N rows of a (P, D, S) chunk, origin indices shifted by offset.'''
+    flat = sums.ravel()
+    k = min(top_n, flat.size)
+    kth = np.partition(flat, k - 1)[k - 1]
+    picked = np.flatnonzero(flat <= kth)  # Keep boundary ties so the merge, not argpartition, decides them
+
+    p, d, s = np.unravel_index(picked, sums.shape)
+    return np.column_stack((flat[picked], p + offset, d, s)).astype(np.float64)
+
+
+def merge_best(a, b, top_n):
+    '''Deterministic top-N merge: lowest error first, ties broken by origin, direction, speed index.'''
+    rows = np.concatenate((a, b), axis=0)
+    order = np.lexsort((rows[:, 3], rows[:, 2], rows[:, 1], rows[:, 0]))
+    return rows[order[:top_n]]
@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .algorithm import score_rifles
+
+
+@dataclass
+class Standing:
+    rank: int
+    rifle: str
+    aggregated_error: float
+    mean_error: float
+    worst_mic: str
+    worst_error: float
+
+
+def rank_rifles(scene, rifles, top=0):
+    '''Every rifle scored in one score_rifles pass, best first. Ties keep the rifles' order. top > 0 keeps only the best.'''
+    if not rifles or not len(scene.mic_names):
+        return []
+
+    errors, aggregated, mean = score_rifles(scene, rifles)
+    worst = errors.argmax(axis=1)
+    order = np.argsort(aggregated, kind='stable')
+    if top > 0:
+        order = order[:top]
+
+    return [
+        Standing(rank + 1, rifles[i].name, float(aggregated[i]), float(mean[i]), scene.mic_names[worst[i]], float(errors[i, worst[i]]))
+        for rank, i in enumerate(order)
+    ]
+
+
+class Leaderboard:
+    '''
+    Context: With dozens of competing rifles, the user needs to see which one fits best without clicking
+    through them one at a time.
+
+    Solution: The latest result of every rifle, by name, with the mic it fits worst. Results arrive from whichever
+    path evaluated the rifle (one batch or one rifle at a time), and standings() ranks them on demand.
+    '''
+    def __init__(self):
+        self.entries = {}
+
+    def update(self, names, aggregated, mean, errors, mic_names):
+        '''errors is (N, M), one row per name, in the order of mic_names.'''
+        errors = np.atleast_2d(errors)
+        if not errors.shape[1]:
+            worst_mics, worst_errors = [''] * len(names), [0.0] * len(names)
+        else:
+            worst = errors.argmax(axis=1)
+            worst_mics = [mic_names[i] for i in worst]
+            worst_errors = errors[np.arange(len(worst)), worst].tolist()
+
+        for name, aggregated_error, mean_error, worst_mic, worst_error in zip(
+                names, np.ravel(aggregated).tolist(), np.ravel(mean).tolist(), worst_mics, worst_errors):
+            self.entries[name] = (aggregated_error, mean_error, worst_mic, worst_error)
+
+    def standings(self, names=None):
+        '''Ranked best first. Pass names to leave out rifles that no longer exist.'''
+        names = list(self.entries) if names is None else [name for name in names if name in self.entries]
+        order = sorted(names, key=lambda name: self.entries[name][0])  # Stable, so ties keep their order
+        return [Standing(rank + 1, name, *self.entries[name]) for rank, name in enumerate(order)]
+
+    def clear(self):
+        self.entries = {}
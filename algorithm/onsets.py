@@ -0,0 +1,214 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from .sweep import worker_pool
+
+ENVELOPE_WINDOW = 0.0005  # Seconds of audio per envelope value. The crack's N-wave lasts about a millisecond
+BLOCK_SECONDS = 10.0  # Audio read per block, so memory stays flat no matter how long the recording is
+THRESHOLD_DB = 20.0  # An event is energy this far above the recording's noise floor
+MERGE_GAP = 0.005  # Seconds below threshold that still count as the same event (echoes, ringing)
+MAX_DELTA_T = 3.0  # Longest crack-thump delay we pair up
+CONFIDENCE_SNR_DB = ((30.0, 3), (20.0, 2))  # Weaker event's SNR -> suggested confidence. Anything lower is 1
+MIN_ENERGY = 1e-20  # Noise floor of digital silence
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+@dataclass
+class Detection:
+    path: str
+    name: str
+    crack_time: float = 0.0
+    thump_time: float = 0.0
+    delta_t: float = 0.0
+    snr_db: float = 0.0
+    confidence: int = 1
+    error: str = ''
+
+
+class WavReader:
+    '''
+    Context: Field recordings can be hours long, far more than we want in RAM at once.
+
+    Solution: We parse the RIFF header ourselves and memory-map the data chunk, so blocks are read from disk
+    only when asked for. Mono float32 in [-1, 1] comes out of block(), whatever the file's sample format.
+    '''
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.read_header(file)
+
+        if self.bits == 24:
+            shape = (self.frame_count, self.channels, 3)
+            self.data = np.memmap(path, dtype=np.uint8, mode='r', offset=self.data_offset, shape=shape)
+        else:
+            shape = (self.frame_count, self.channels)
+            self.data = np.memmap(path, dtype=self.sample_dtype(), mode='r', offset=self.data_offset, shape=shape)
+
+    def read_header(self, file):
+        riff, _, wave = struct.unpack('<4sI4s', file.read(12))
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise ValueError("not a RIFF/WAVE file")
+
+        self.format = None
+        while True:
+            header = file.read(8)
+            if len(header) < 8:
+                raise ValueError("no data chunk")
+            chunk_id, size = struct.unpack('<4sI', header)
+
+            if chunk_id == b'fmt ':
+                self.read_format(file.read(size))
+                file.seek(size % 2, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if self.format is None:
+                    raise ValueError("data chunk before fmt chunk")
+                self.data_offset = file.tell()
+                available = os.fstat(file.fileno()).st_size - self.data_offset
+                self.frame_count = min(size, available) // self.block_align  # Tolerates recorders that die mid-write
+                return
+            else:
+                file.seek(size + size % 2, os.SEEK_CUR)
+
+    def read_format(self, chunk):
+        self.format, self.channels, self.sample_rate, _, self.block_align, self.bits = struct.unpack('<HHIIHH', chunk[:16])
+        if self.format == WAVE_FORMAT_EXTENSIBLE and len(chunk) >= 26:
+            self.format = struct.unpack('<H', chunk[24:26])[0]  # First two bytes of the sub-format GUID
+
+        if (self.format, self.bits) not in ((WAVE_FORMAT_PCM, 8), (WAVE_FORMAT_PCM, 16), (WAVE_FORMAT_PCM, 24),
+                                            (WAVE_FORMAT_PCM, 32), (WAVE_FORMAT_IEEE_FLOAT, 32), (WAVE_FORMAT_IEEE_FLOAT, 64)):
+            raise ValueError(f"unsupported sample format {self.format} with {self.bits} bits")
+
+    def sample_dtype(self):
+        if self.format == WAVE_FORMAT_IEEE_FLOAT:
+            return np.dtype(f'<f{self.bits // 8}')
+        if self.bits == 8:
+            return np.dtype(np.uint8)
+        return np.dtype(f'<i{self.bits // 8}')
+
+    def block(self, start, stop):
+        raw = self.data[max(0, start):min(stop, self.frame_count)]
+
+        if self.bits == 24:
+            raw = raw.astype(np.int32)
+            samples = raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)
+            samples = ((samples ^ 0x800000) - 0x800000) / float(1 << 23)  # Sign-extend
+        elif self.format == WAVE_FORMAT_IEEE_FLOAT:
+            samples = raw
+        elif self.bits == 8:
+            samples = (raw.astype(np.float32) - 128.0) / 128.0
+        else:
+            samples = raw / float(1 << (self.bits - 1))
+
+        return np.asarray(samples, dtype=np.float32).mean(axis=1)
+
+
+def energy_envelope(reader, window_frames):
+    '''Mean energy of every window_frames samples, read one block at a time.'''
+    windows_per_block = max(1, int(BLOCK_SECONDS * reader.sample_rate) // window_frames)
+    block_frames = windows_per_block * window_frames
+    window_count = reader.frame_count // window_frames
+
+    envelope = np.empty(window_count, dtype=np.float32)
+    for start in range(0, window_count * window_frames, block_frames):
+        samples = reader.block(start, min(start + block_frames, window_count * window_frames))
+        windows = samples.reshape(-1, window_frames)
+        first = start // window_frames
+        envelope[first:first + len(windows)] = np.einsum('ij,ij->i', windows, windows) / window_frames
+    return envelope
+
+
+def find_events(envelope, threshold, merge_windows):
+    '''Runs of the envelope above threshold, merged across short gaps. Returns (starts, peaks) per event.'''
+    above = np.flatnonzero(envelope > threshold)
+    if len(above) == 0:
+        return above, np.empty(0, dtype=envelope.dtype)
+
+    breaks = np.flatnonzero(np.diff(above) > merge_windows)
+    starts = above[np.concatenate(([0], breaks + 1))]
+    peaks = np.maximum.reduceat(envelope, starts)
+    return starts, peaks
+
+
+def refine_onset(reader, window, window_frames, threshold):
+    '''First sample at or above the threshold amplitude, searching from one window before the detected one.'''
+    start = max(0, (window - 1) * window_frames)
+    samples = reader.block(start, (window + 1) * window_frames)
+    loud = np.flatnonzero(samples * samples >= threshold)
+    return start + (int(loud[0]) if len(loud) else window_frames)
+
+
+def suggest_confidence(snr_db):
+    for min_snr_db, confidence in CONFIDENCE_SNR_DB:
+        if snr_db >= min_snr_db:
+            return confidence
+    return 1
+
+
+def detect_onsets(path):
+    '''
+    Finds the first crack-thump pair in one recording: the crack is the first event and the thump the next event
+    within MAX_DELTA_T. The noise floor is the envelope's median, which shots are too short to move.
+    '''
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        reader = WavReader(path)
+    except (OSError, ValueError, struct.error) as error:
+        return Detection(path, name, error=str(error))
+
+    window_frames = max(1, int(round(ENVELOPE_WINDOW * reader.sample_rate)))
+    envelope = energy_envelope(reader, window_frames)
+    if len(envelope) == 0:
+        return Detection(path, name, error="recording is empty")
+
+    noise_floor = max(float(np.median(envelope)), MIN_ENERGY)
+    threshold = noise_floor * 10.0 ** (THRESHOLD_DB / 10.0)
+    window_seconds = window_frames / reader.sample_rate
+    starts, peaks = find_events(envelope, threshold, int(MERGE_GAP / window_seconds))
+
+    pairs = np.flatnonzero(np.diff(starts) * window_seconds <= MAX_DELTA_T)
+    if len(pairs) == 0:
+        return Detection(path, name, error=f"found {len(starts)} sound events but no crack-thump pair")
+
+    crack, thump = int(pairs[0]), int(pairs[0]) + 1
+    crack_time = refine_onset(reader, int(starts[crack]), window_frames, threshold) / reader.sample_rate
+    thump_time = refine_onset(reader, int(starts[thump]), window_frames, threshold) / reader.sample_rate
+    snr_db = 10.0 * np.log10(min(peaks[crack], peaks[thump]) / noise_floor)
+
+    return Detection(
+        path,
+        name,
+        crack_time=crack_time,
+        thump_time=thump_time,
+        delta_t=thump_time - crack_time,
+        snr_db=float(snr_db),
+        confidence=suggest_confidence(snr_db)
+    )
+
+
+def detect_folder(directory, workers=0):
+    '''detect_onsets for every .wav in a folder, one file per worker process. Returns Detections sorted by file name.'''
+    paths = sorted(
+        os.path.join(directory, file_name)
+        for file_name in os.listdir(directory)
+        if file_name.lower().endswith('.wav')
+    )
+    return detect_files(paths, workers)
+
+
+def detect_files(paths, workers=0):
+    workers = min(len(paths), workers if workers > 0 else (os.cpu_count() or 1))
+    if workers <= 1:
+        return [detect_onsets(path) for path in paths]
+
+    with worker_pool(workers) as executor:
+        return list(executor.map(detect_onsets, paths))
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import apply_margin_errors
+from .grid_search import MAX_CHUNK_ELEMENTS, predict_chunk
+from .uncertainty import DELTA_T_SIGMA
+
+CREDIBLE_MASS = 0.95
+DEFAULT_MODEL_SIGMA = 0.002  # Seconds. Grid spacing, temperature and mic placement errors, added to every mic's spread
+
+
+@dataclass
+class Posterior:
+    probability: np.ndarray  # (P,) sums to 1 over the grid
+    log_likelihood: np.ndarray  # (P,) per origin, marginalized over aim and speed
+    best_direction: np.ndarray  # (P,) index of the most likely aim at each origin
+    best_speed: np.ndarray  # (P,) index of the most likely speed at each origin
+    credible: np.ndarray  # (P,) True for origins inside the credible region
+    credible_mass: float  # Probability the credible region actually holds, at least the mass asked for
+
+    @property
+    def map_index(self):
+        '''Most probable origin.'''
+        return int(self.probability.argmax())
+
+
+def mic_sigmas(confidences, model_sigma=DEFAULT_MODEL_SIGMA):
+    '''Timing spread (s) of each mic's delta-t: its confidence's DELTA_T_SIGMA and model_sigma, in quadrature.'''
+    sigmas = np.asarray(DELTA_T_SIGMA)[np.clip(np.asarray(confidences, dtype=np.int64), 1, 3) - 1]
+    return np.sqrt(sigmas * sigmas + model_sigma * model_sigma)
+
+
+def posterior_grid(mic_positions, actual_delta_ts, confidences, c, error_margin, origins, directions, speeds_mps,
+                   model_sigma=DEFAULT_MODEL_SIGMA, credible_mass=CREDIBLE_MASS):
+    '''
+    Context: The aggregated error tells us which candidate fits better, but not how much better, or how likely
+    the shooter was to stand anywhere else.
+
+    Solution: Each mic's residual is Gaussian with the spread from mic_sigmas, so a candidate's log-likelihood is
+    -0.5 * sum((error / sigma)^2). With flat priors, an origin's likelihood is the mean over every aim direction
+    and speed (a log-sum-exp per origin), and the posterior is those likelihoods normalized over the grid.
+    Origins are scored in the same chunks as grid_search, so memory stays bounded at any resolution.
+    '''
+    mics = np.asarray(mic_positions, dtype=np.float64).reshape(-1, 3)
+    actual = np.asarray(actual_delta_ts, dtype=np.float64)
+    weights = 0.5 / mic_sigmas(confidences, model_sigma) ** 2
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+    speeds = np.asarray(speeds_mps, dtype=np.float64).ravel()
+
+    per_origin = max(1, len(directions) * len(speeds) * len(mics))
+    chunk = max(1, MAX_CHUNK_ELEMENTS // per_origin)
+
+    log_likelihood = np.empty(len(origins))
+    best_direction = np.empty(len(origins), dtype=np.int64)
+    best_speed = np.empty(len(origins), dtype=np.int64)
+    for start in range(0, len(origins), chunk):
+        stop = min(start + chunk, len(origins))
+        predictions = predict_chunk(mics, c, origins[start:stop], directions, speeds)
+        errors = apply_margin_errors(np.abs(predictions - actual), error_margin)
+        log_l = -np.einsum('pdsm,pdsm,m->pds', errors, errors, weights).reshape(stop - start, -1)  # (P, D*S)
+
+        peak = log_l.max(axis=1)
+        log_likelihood[start:stop] = peak + np.log(np.exp(log_l - peak[:, np.newaxis]).mean(axis=1))
+        best_direction[start:stop], best_speed[start:stop] = np.unravel_index(log_l.argmax(axis=1), (len(directions), len(speeds)))
+
+    probability = np.exp(log_likelihood - log_likelihood.max())
+    probability /= probability.sum()
+    credible, mass = credible_region(probability, credible_mass)
+    return Posterior(probability, log_likelihood, best_direction, best_speed, credible, mass)
+
+
+def credible_region(probability, mass=CREDIBLE_MASS):
+    '''Smallest set of origins holding at least mass of the probability: the most probable first. Returns (mask, mass held).'''
+    order = np.argsort(-probability, kind='stable')
+    cumulative = np.cumsum(probability[order])
+    count = min(int(np.searchsorted(cumulative, mass)) + 1, len(order))
+
+    mask = np.zeros(len(probability), dtype=bool)
+    mask[order[:count]] = True
+    return mask, float(cumulative[count - 1])
@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import numpy as np
+
+MAX_ITERATIONS = 50
+STEP_TOLERANCE = 1e-9
+INITIAL_DAMPING = 1e-3
+MIN_PERPENDICULAR = 1e-9  # Keeps dr/d(params) finite for a mic sitting exactly on the bullet line
+MIN_MACH = 1.0001  # Speed is kept just above the speed of sound while refining
+
+
+def direction_to_angles(direction):
+    '''Azimuth (from +X toward +Y) and elevation (toward +Z) of a unit aim vector, in radians.'''
+    x, y, z = direction
+    return np.arctan2(y, x), np.arcsin(np.clip(z, -1.0, 1.0))
+
+
+def angles_to_direction(azimuth, elevation):
+    return np.array((
+        np.cos(elevation) * np.cos(azimuth),
+        np.cos(elevation) * np.sin(azimuth),
+        np.sin(elevation)
+    ))
+
+
+def predict_with_jacobian(mic_positions, params, c):
+    '''
+    Predicted delta-t for every mic plus the analytic Jacobian of math.calculate.
+
+    params : (origin x, origin y, origin z, azimuth, elevation, bullet speed m/s)
+
+    Returns predictions (M,) and J (M, 6), one column per param.
+    '''
+    origin = params[:3]
+    azimuth, elevation, v = params[3], params[4], params[5]
+    d = angles_to_direction(azimuth, elevation)
+
+    R = mic_positions - origin
+    R_mag = np.linalg.norm(R, axis=1)
+    x = R @ d
+    r = np.sqrt(np.maximum(R_mag * R_mag - x * x, 0.0))
+    r_safe = np.maximum(r, MIN_PERPENDICULAR)
+    R_perp = R - np.outer(x, d)
+
+    root = np.sqrt(max(v*v - c*c, 0.0))
+    supersonic = v > c
+    cot_theta = root / c if supersonic else 0.0
+    tan_theta = c / root if supersonic else np.inf
+
+    t_crack = (x + r * cot_theta) / v
+    cracked = supersonic & (x >= r * tan_theta) & (t_crack > 0.0)
+
+    t_thump = R_mag / c
+    predictions = np.where(cracked, t_thump - t_crack, 0.0)
+
+    dthump_dorigin = -R / (R_mag[:, np.newaxis] * c)
+    dcrack_dorigin = -(d[np.newaxis, :] + cot_theta * R_perp / r_safe[:, np.newaxis]) / v
+    dpred_dorigin = dthump_dorigin - dcrack_dorigin
+
+    dpred_ddirection = -R * ((1.0 - cot_theta * x / r_safe) / v)[:, np.newaxis]
+    dd_dazimuth = np.array((-np.cos(elevation) * np.sin(azimuth), np.cos(elevation) * np.cos(azimuth), 0.0))
+    dd_delevation = np.array((-np.sin(elevation) * np.cos(azimuth), -np.sin(elevation) * np.sin(azimuth), np.cos(elevation)))
+
+    dpred_dv = x / (v*v) - r * c / (v*v * root) if supersonic else np.zeros_like(x)
+
+    J = np.column_stack((
+        dpred_dorigin,
+        dpred_ddirection @ dd_dazimuth,
+        dpred_ddirection @ dd_delevation,
+        dpred_dv
+    ))
+    J[~cracked] = 0.0
+    return predictions, J
+
+
+def refine(mic_positions, actual_delta_ts, origin, direction, v, c, fit_speed=False, max_iterations=MAX_ITERATIONS):
+    '''
+    Levenberg-Marquardt least squares on predicted minus actual delta-t, starting from a candidate rifle.
+
+    Returns (origin, direction, v, cost, iterations). Cost is the sum of squared residuals in seconds squared.
+    '''
+    mics = np.asarray(mic_positions, dtype=np.float64).reshape(-1, 3)
+    actual = np.asarray(actual_delta_ts, dtype=np.float64)
+    azimuth, elevation = direction_to_angles(np.asarray(direction, dtype=np.float64))
+    params = np.array((*np.asarray(origin, dtype=np.float64), azimuth, elevation, max(float(v), c * MIN_MACH)))
+    free = slice(0, 6 if fit_speed else 5)
+
+    predictions, J = predict_with_jacobian(mics, params, c)
+    residual = predictions - actual
+    cost = float(residual @ residual)
+    damping = INITIAL_DAMPING
+
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        J_free = J[:, free]
+        A = J_free.T @ J_free
+        g = J_free.T @ residual
+        scaled = A + damping * np.diag(np.maximum(np.diag(A), 1e-12))
+
+        try:
+            step = np.linalg.solve(scaled, -g)
+        except np.linalg.LinAlgError:
+            break
+
+        trial = params.copy()
+        trial[free] += step
+        trial[5] = max(trial[5], c * MIN_MACH)
+
+        trial_predictions, trial_J = predict_with_jacobian(mics, trial, c)
+        trial_residual = trial_predictions - actual
+        trial_cost = float(trial_residual @ trial_residual)
+
+        if trial_cost < cost:
+            converged = cost - trial_cost <= STEP_TOLERANCE * max(cost, 1e-12) or np.abs(step).max() <= STEP_TOLERANCE
+            params, residual, J, cost = trial, trial_residual, trial_J, trial_cost
+            damping = max(damping / 10.0, 1e-12)
+            if converged:
+                break
+        else:
+            damping *= 10.0
+            if damping > 1e12:
+                break
+
+    return params[:3], angles_to_direction(params[3], params[4]), params[5], cost, iterations
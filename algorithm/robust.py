@@ -0,0 +1,103 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import score_errors
+
+SCORING_MODES = ('ABSOLUTE', 'HUBER', 'TUKEY')
+DEFAULT_SCORING = 'ABSOLUTE'
+DEFAULT_ROBUST_SCALE = 0.010  # Seconds. Errors beyond this are treated as possible mis-picks
+MIN_SUBSET_SIZE = 3
+CONSENSUS_ITERATIONS = 512
+MAX_CHUNK_ELEMENTS = 2**21  # Candidates x subsets per matmul
+
+
+@dataclass
+class Consensus:
+    candidate: int  # Row of the residual matrix the consensus agrees on
+    inliers: np.ndarray  # (M,) mics within the scale of that candidate
+    inlier_counts: np.ndarray  # (N,) inliers per candidate
+    subset: np.ndarray  # (M,) the sampled mic subset that found it
+
+
+def huber_loss(errors, scale):
+    '''Quadratic up to scale, linear after, in seconds. A mis-picked mic costs its error, not its error squared.'''
+    errors = np.abs(errors)
+    return np.where(errors <= scale, errors * errors / (2.0 * scale), errors - scale / 2.0)
+
+
+def tukey_loss(errors, scale):
+    '''Tukey's biweight, in seconds. Flat beyond scale, so a mis-picked mic costs the same however far off it is.'''
+    ratio = np.minimum(np.abs(errors) / scale, 1.0)
+    return scale / 6.0 * (1.0 - (1.0 - ratio * ratio) ** 3)
+
+
+def mic_losses(errors, scoring=DEFAULT_SCORING, scale=DEFAULT_ROBUST_SCALE):
+    '''Each mic's cost under the scoring mode, same shape as errors. ABSOLUTE costs the error itself.'''
+    if scoring == 'HUBER':
+        return huber_loss(errors, scale)
+    if scoring == 'TUKEY':
+        return tukey_loss(errors, scale)
+    return errors
+
+
+def score(errors, scoring=DEFAULT_SCORING, scale=DEFAULT_ROBUST_SCALE):
+    '''score_errors with an optional robust loss. Returns (aggregated, mean), each (N,).'''
+    if scoring not in ('HUBER', 'TUKEY'):
+        return score_errors(errors)
+
+    losses = np.atleast_2d(mic_losses(errors, scoring, scale))
+    aggregated = losses.sum(axis=-1)  # Not rounded like score_errors: bounded losses are small enough to tie at 3 decimals
+    return aggregated, aggregated / max(losses.shape[-1], 1)
+
+
+def consensus(errors, scale=DEFAULT_ROBUST_SCALE, subset_size=0, iterations=CONSENSUS_ITERATIONS, seed=0):
+    '''
+    Context: One mis-picked thump can make the wrong candidate rank first, and nothing tells the user which mic it was.
+
+    Solution: RANSAC over mic subsets, on the (N candidates, M mics) residual matrix. Each random subset picks the
+    candidate that fits it best, and every mic then votes on that candidate by being within scale of it.
+    The pick with the most votes wins, and the mics that did not vote for it are the outliers. All subsets are
+    scored against all candidates in one matrix product, so nothing is re-predicted.
+    '''
+    errors = np.atleast_2d(np.asarray(errors, dtype=np.float64))
+    candidate_count, mic_count = errors.shape
+    if not candidate_count or not mic_count:
+        raise ValueError("consensus needs at least one candidate and one mic")
+    within = errors <= scale
+    inlier_counts = within.sum(axis=1)
+
+    subset_size = subset_size or max(MIN_SUBSET_SIZE, mic_count // 2)
+    subsets = sample_subsets(mic_count, min(subset_size, mic_count), iterations, seed)
+
+    picks = best_candidates(errors, subsets)
+    votes = inlier_counts[picks]
+    spread = (errors[picks] * within[picks]).sum(axis=1)
+    winner = np.lexsort((spread, -votes))[0]  # Most inliers, then the tightest fit among them
+
+    candidate = int(picks[winner])
+    return Consensus(candidate, within[candidate], inlier_counts, subsets[winner])
+
+
+def sample_subsets(mic_count, subset_size, iterations, seed):
+    '''(K, M) boolean rows, each with subset_size random mics. Drawn as the smallest keys of random rows.'''
+    rng = np.random.default_rng(seed)
+    keys = rng.random((iterations, mic_count))
+    chosen = np.argpartition(keys, subset_size - 1, axis=1)[:, :subset_size]
+    subsets = np.zeros((iterations, mic_count), dtype=bool)
+    np.put_along_axis(subsets, chosen, True, axis=1)
+    return np.unique(subsets, axis=0)
+
+
+def best_candidates(errors, subsets):
+    '''Per subset, the candidate with the smallest summed error over its mics. Returns (K,) row indices.'''
+    weights = subsets.T.astype(np.float64)
+    chunk = max(1, MAX_CHUNK_ELEMENTS // max(len(errors), 1))
+    picks = np.empty(len(subsets), dtype=np.int64)
+    for start in range(0, len(subsets), chunk):
+        picks[start:start + chunk] = (errors @ weights[:, start:start + chunk]).argmin(axis=0)
+    return picks
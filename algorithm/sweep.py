@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .grid_search import grid_search, merge_best
+from .robust import DEFAULT_ROBUST_SCALE, DEFAULT_SCORING
+
+CHUNKS_PER_WORKER = 4  # More chunks than workers so a slow chunk doesn't leave cores idle
+
+PACKAGE_NAME = __name__.rsplit('.', 2)[0]
+PACKAGE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Workers import the package's modules without running the add-on's __init__.py, which needs bpy.
+PACKAGE_BOOTSTRAP = '''
+import sys, types
+parts = package_name.split('.')
+for i in range(1, len(parts) + 1):
+    name = '.'.join(parts[:i])
+    if name not in sys.modules:
+        module = types.ModuleType(name)
+        module.__path__ = [package_path] if i == len(parts) else []
+        sys.modules[name] = module
+'''
+
+WORKER_BOOTSTRAP = PACKAGE_BOOTSTRAP + '''
+import importlib
+importlib.import_module(package_name + '.algorithm.sweep').load_payload(payload)
+'''
+
+_PAYLOAD = None
+
+
+def serialize_payload(mic_positions, actual_delta_ts, speed_sound_mps, error_margin, origins, directions, speeds_mps, top_n,
+                      scoring=DEFAULT_SCORING, robust_scale=DEFAULT_ROBUST_SCALE):
+    '''Everything a worker needs, pickled once and handed to each worker when it starts.'''
+    return pickle.dumps({
+        'mic_positions': np.ascontiguousarray(mic_positions, dtype=np.float64).reshape(-1, 3),
+        'actual_delta_ts': np.ascontiguousarray(actual_delta_ts, dtype=np.float64),
+        'speed_sound_mps': float(speed_sound_mps),
+        'error_margin': float(error_margin),
+        'origins': np.ascontiguousarray(origins, dtype=np.float64).reshape(-1, 3),
+        'directions': np.ascontiguousarray(directions, dtype=np.float64).reshape(-1, 3),
+        'speeds_mps': np.ascontiguousarray(speeds_mps, dtype=np.float64).ravel(),
+        'top_n': int(top_n),
+        'scoring': scoring,
+        'robust_scale': float(robust_scale),
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_payload(blob):
+    global _PAYLOAD
+    _PAYLOAD = pickle.loads(blob)
+
+
+def sweep_chunk(start, stop):
+    '''Worker entry point. Scores origins[start:stop] and returns their top-N rows and per-origin minimums.'''
+    data = _PAYLOAD
+    best, min_errors = grid_search(
+        data['mic_positions'],
+        data['actual_delta_ts'],
+        data['speed_sound_mps'],
+        data['error_margin'],
+        data['origins'][start:stop],
+        data['directions'],
+        data['speeds_mps'],
+        top_n=data['top_n'],
+        scoring=data['scoring'],
+        robust_scale=data['robust_scale']
+    )
+    best[:, 1] += start
+    return start, stop, best, min_errors
+
+
+class Sweep:
+    '''
+    Context: A full position x heading x elevation x speed sweep is too much for one process.
+
+    Solution: We split the search volume's origins into chunks and score them on a pool of worker processes.
+
+    Reduction: Per-chunk top-N rows are merged with grid_search's total ordering, so the result is identical
+    to a serial grid_search no matter how the chunks are split or in which order they finish.
+    '''
+    def __init__(self, payload, origin_count, top_n, workers=0):
+        self.payload = payload
+        self.origin_count = origin_count
+        self.top_n = top_n
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+
+    def start(self):
+        chunk_count = min(self.origin_count, self.workers * CHUNKS_PER_WORKER)
+        bounds = np.linspace(0, self.origin_count, max(1, chunk_count) + 1).astype(np.int64)
+
+        self.executor = worker_pool(self.workers, WORKER_BOOTSTRAP, payload=self.payload)
+        self.futures = [
+            self.executor.submit(sweep_chunk, int(start), int(stop))
+            for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+        ]
+        return self
+
+    def progress(self):
+        return sum(future.done() for future in self.futures) / max(1, len(self.futures))
+
+    def done(self):
+        return all(future.done() for future in self.futures)
+
+    def reduce(self):
+        min_errors = np.empty(self.origin_count, dtype=np.float64)
+        best = np.empty((0, 4), dtype=np.float64)
+
+        try:
+            for future in self.futures:  # Submission order, not completion order
+                start, stop, chunk_best, chunk_min = future.result()
+                min_errors[start:stop] = chunk_min
+                best = merge_best(best, chunk_best, self.top_n)
+        finally:
+            self.executor.shutdown(cancel_futures=True)  # Also when a worker failed, so no process outlives the sweep
+        return best, min_errors
+
+    def cancel(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def worker_pool(workers, bootstrap=PACKAGE_BOOTSTRAP, **variables):
+    '''Spawned process pool whose workers can import this package. variables are visible to the bootstrap code.'''
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=exec,
+        initargs=(bootstrap, {
+            'package_name': PACKAGE_NAME,
+            'package_path': PACKAGE_PATH,
+            **variables,
+        })
+    )
+
+
+def sweep(payload, origin_count, top_n, workers=0):
+    '''Blocking convenience wrapper: start the pool, wait, and reduce.'''
+    return Sweep(payload, origin_count, top_n, workers).start().reduce()
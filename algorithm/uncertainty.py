@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import aim_directions, calculate_batch, residuals
+from .robust import score
+from .speed_sound import speed_sound
+
+FPS_TO_MPS = 0.3048
+
+DELTA_T_SIGMA = (0.010, 0.005, 0.002)  # Spread of a mic's delta_t (s) at confidence 1, 2 and 3
+PERCENTILES = (5.0, 50.0, 95.0)
+MAX_CHUNK_ELEMENTS = 2**21  # Draws x mics drawn and scored per pass, so memory stays bounded for many draws
+MAX_BAND_ELEMENTS = 2**24  # Draws x mics kept per rifle for its per-mic bands. Beyond this, the first draws only
+
+
+@dataclass
+class UncertaintySettings:
+    draws: int = 2000
+    temp_sigma_f: float = 3.0
+    mic_position_sigma: float = 0.5  # Meters, per axis
+    speed_sigma: float = 0.02  # Fraction of the rifle's ammo speed
+    delta_t_scale: float = 1.0  # Multiplies each mic's DELTA_T_SIGMA. 0 trusts every delta_t exactly
+    seed: int = 0  # Fixed so results don't flicker between evaluations of the same scene
+
+
+@dataclass
+class UncertaintyResult:
+    percentiles: tuple
+    aggregated_errors: np.ndarray  # (N, draws)
+    mean_errors: np.ndarray  # (N, draws)
+    aggregated_bands: np.ndarray  # (N, P)
+    mean_bands: np.ndarray  # (N, P)
+    mic_bands: np.ndarray  # (N, M, P) per-mic error percentiles
+    best_fraction: np.ndarray  # (N,) share of draws in which each rifle has the smallest mean error
+
+
+def monte_carlo(scene, rifles, settings=None):
+    '''
+    Context: A rifle's error is only as good as the measurements behind it. A confidence 1 mic, a guessed
+    temperature or a rough mic position can move a candidate up or down the ranking.
+
+    Solution: We draw every uncertain input thousands of times and score the draws in chunks. The delta_t
+    spread comes from each mic's confidence. Each rifle replays the same seeded stream of draws, so every rifle
+    sees the same draws and best_fraction compares them fairly, while only one chunk of draws exists at a time.
+
+    Limitation: Draws use the constant-speed model, even with air drag on, because each drawn speed and temperature
+    would need its own flight table.
+    '''
+    settings = settings or UncertaintySettings()
+    draws = max(1, int(settings.draws))
+    mic_count = len(np.asarray(scene.mic_positions).reshape(-1, 3))
+    band_draws = min(draws, max(1, MAX_BAND_ELEMENTS // max(mic_count, 1)))
+
+    origins = np.array([rifle.origin for rifle in rifles], dtype=np.float64).reshape(-1, 3)
+    endpoints = np.array([rifle.endpoint for rifle in rifles], dtype=np.float64).reshape(-1, 3)
+    directions = aim_directions(origins, endpoints)
+    speeds = np.array([float(rifle.ammo_speed) * FPS_TO_MPS for rifle in rifles], dtype=np.float64)
+
+    aggregated = np.empty((len(rifles), draws))
+    mic_bands = np.empty((len(rifles), mic_count, len(PERCENTILES)))
+    for i, (origin, direction, speed) in enumerate(zip(origins, directions, speeds)):
+        band_errors = np.empty((band_draws, mic_count))
+        for start, mics, speed_factors, speed_sound_mps, actual in draw_chunks(scene, settings, draws):
+            stop = start + len(actual)
+            errors = chunk_errors(mics, origin, direction, speed * speed_factors, speed_sound_mps, actual, scene.error_margin)
+            aggregated[i, start:stop] = score(errors, scene.scoring, scene.robust_scale)[0]
+            if start < band_draws:
+                band_errors[start:min(stop, band_draws)] = errors[:band_draws - start]
+        mic_bands[i] = np.percentile(band_errors, PERCENTILES, axis=0).T
+
+    mean = aggregated / max(mic_count, 1)
+    best = np.bincount(mean.argmin(axis=0), minlength=len(rifles)) / draws if len(rifles) else np.empty(0)
+
+    return UncertaintyResult(
+        percentiles=PERCENTILES,
+        aggregated_errors=aggregated,
+        mean_errors=mean,
+        aggregated_bands=np.percentile(aggregated, PERCENTILES, axis=1).T,
+        mean_bands=np.percentile(mean, PERCENTILES, axis=1).T,
+        mic_bands=mic_bands,
+        best_fraction=best
+    )
+
+
+def draw_chunks(scene, settings, draws):
+    '''
+    Yields (start, mics, speed_factors, speed_sound_mps, actual) per chunk of draws, with mics (D, M, 3), actual (D, M)
+    and the rest (D,). The stream is seeded, so every call yields the same draws.
+    '''
+    rng = np.random.default_rng(settings.seed)
+    mic_positions = np.asarray(scene.mic_positions, dtype=np.float64).reshape(-1, 3)
+    mic_count = len(mic_positions)
+    actual_delta_ts = np.asarray(scene.actual_delta_ts, dtype=np.float64)
+    sigmas = settings.delta_t_scale * np.asarray(DELTA_T_SIGMA)[np.clip(np.asarray(scene.mic_confidences), 1, 3) - 1]
+    chunk = max(1, MAX_CHUNK_ELEMENTS // max(mic_count, 1))
+
+    for start in range(0, draws, chunk):
+        count = min(chunk, draws - start)
+        temps = scene.temp_f + rng.normal(0.0, settings.temp_sigma_f, count)
+        actual = np.maximum(actual_delta_ts + rng.normal(0.0, 1.0, (count, mic_count)) * sigmas, 0.0)
+        mics = mic_positions + rng.normal(0.0, settings.mic_position_sigma, (count, mic_count, 3))
+        speed_factors = 1.0 + rng.normal(0.0, settings.speed_sigma, count)
+        yield start, mics, speed_factors, speed_sound(temps), actual
+
+
+def chunk_errors(mics, origin, direction, v, c, actual, error_margin):
+    '''One rifle under a chunk of draws. mics (D, M, 3), v and c (D,), actual (D, M). Returns (D, M) errors.'''
+    R = mics - origin
+    R_sq = np.einsum('dmk,dmk->dm', R, R)
+    x = R @ direction
+    r = np.sqrt(np.maximum(R_sq - x * x, 0.0))
+    predictions = calculate_batch(x, r, np.sqrt(R_sq), v[:, np.newaxis], c[:, np.newaxis])
+    return residuals(predictions, actual, error_margin)
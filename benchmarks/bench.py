@@ -0,0 +1,198 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+'''
+Time Calcrack's hot paths on synthetic scenes, and compare against earlier runs.
+
+    python -m calcrack.benchmarks.bench
+    python -m calcrack.benchmarks.bench --plan full --suites candidates live_update --label numpy-2.1
+    blender -b --addons calcrack --python calcrack/benchmarks/bench.py -- --plan quick
+
+Scenes have 4 to 10,000 mics and 1 to 1,000,000 candidates (see suites.PLANS), laid out and perturbed as set
+by --layout, --noise and --mis-picks, so every run on a machine sees the same scenes. Outside Blender, bpy,
+bmesh and mathutils are replaced by stand_in, which times Calcrack's own work without Blender's.
+
+Every run is appended as one JSON line to the results file, and printed next to the previous run of the same
+plan. A case whose median got slower by more than --threshold counts as a regression, and the exit status is 1.
+'''
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+if __name__ == '__main__' and not __package__:  # Run as a script, e.g. blender -b --python bench.py
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    __package__ = os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + ".benchmarks"
+
+import numpy as np
+
+from .stand_in import install
+
+IS_STAND_IN = install()  # Before anything below imports bpy
+
+from .scenarios import LAYOUTS
+from .suites import PLANS, SUITES, plan_cases
+from ..maintenance.profiler import PROFILER
+
+DEFAULT_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.jsonl")
+DEFAULT_THRESHOLD = 0.10  # Medians this much slower than the previous run are reported as regressions
+MIN_SECONDS = 0.5  # Per case, repeats stop once this much time was measured...
+MIN_REPEATS = 3  # ...and at least this many repeats ran
+MAX_REPEATS = 1000
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    previous = last_run(args.results, args.plan, args.against)
+
+    settings = {'layout': args.layout, 'noise': args.noise, 'mis_picks': args.mis_picks, 'seed': args.seed}
+    cases = []
+    for case in plan_cases(args.plan, args.suites, settings, IS_STAND_IN):
+        cases.append(measure(case, args.spans))
+        print_case(cases[-1], previous)
+
+    run = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'label': args.label,
+        'plan': args.plan,
+        'settings': settings,
+        'environment': environment(),
+        'cases': cases,
+    }
+    with open(args.results, 'a') as file:
+        file.write(json.dumps(run) + '\n')
+
+    regressions = find_regressions(cases, previous, args.threshold)
+    for case, ratio in regressions:
+        print(f"Regression: {case['name']} is {(ratio - 1.0) * 100.0:.0f}% slower than {previous['created']}")
+    return 1 if regressions else 0
+
+
+def parse_args(argv):
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]  # Blender's own args come before --
+
+    parser = argparse.ArgumentParser(prog="calcrack-bench", description="Time Calcrack on synthetic scenes.")
+    parser.add_argument('--plan', choices=list(PLANS), default='quick', help="Scene sizes to run")
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES), help="Suites to run. Defaults to all")
+    parser.add_argument('--layout', choices=LAYOUTS, default='RANDOM', help="How mics are placed downrange")
+    parser.add_argument('--noise', type=float, default=0.001, help="Delta-t noise in seconds at confidence 3")
+    parser.add_argument('--mis-picks', type=float, default=0.0, help="Share of mics given a random delta-t")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--spans', action='store_true', help="Also store the profiler's per-step means. Adds a little overhead")
+    parser.add_argument('--label', default='', help="Name for this run, e.g. the change being measured")
+    parser.add_argument('--results', default=DEFAULT_RESULTS, help="JSON Lines file runs are appended to")
+    parser.add_argument('--against', default=None, help="Compare with the last run carrying this label instead of the last run")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Slowdown that counts as a regression")
+    return parser.parse_args(argv)
+
+
+def measure(case, spans=False):
+    '''Warms up once, then repeats until MIN_SECONDS and MIN_REPEATS are both reached.'''
+    try:
+        case.run()
+        PROFILER.clear()
+        PROFILER.enabled = spans
+
+        seconds = []
+        while len(seconds) < MAX_REPEATS and (len(seconds) < MIN_REPEATS or sum(seconds) < MIN_SECONDS):
+            seconds.append(case.run())
+    finally:
+        PROFILER.enabled = False
+        if case.teardown:
+            case.teardown()
+
+    seconds = np.array(seconds)
+    result = {
+        'name': case.name,
+        'suite': case.suite,
+        'params': case.params,
+        'repeats': len(seconds),
+        'min': float(seconds.min()),
+        'median': float(np.median(seconds)),
+        'mean': float(seconds.mean()),
+        'max': float(seconds.max()),
+    }
+    if spans:
+        result['spans'] = {stat['name']: stat['mean'] for stat in PROFILER.stats()}
+    return result
+
+
+def last_run(path, plan, label=None):
+    '''Most recent stored run of the same plan, optionally with the given label.'''
+    if not os.path.exists(path):
+        return None
+
+    found = None
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            run = json.loads(line)
+            if run.get('plan') == plan and (label is None or run.get('label') == label):
+                found = run
+    return found
+
+
+def find_regressions(cases, previous, threshold):
+    if previous is None:
+        return []
+
+    before = {case['name']: case['median'] for case in previous['cases']}
+    regressions = []
+    for case in cases:
+        if before.get(case['name']):
+            ratio = case['median'] / before[case['name']]
+            if ratio > 1.0 + threshold:
+                regressions.append((case, ratio))
+    return regressions
+
+
+def print_case(case, previous):
+    line = f"{case['name']:<52} {format_seconds(case['median']):>10}  ({case['repeats']}x)"
+    before = {old['name']: old['median'] for old in previous['cases']} if previous else {}
+    if before.get(case['name']):
+        line += f"  was {format_seconds(before[case['name']])}, {(case['median'] / before[case['name']] - 1.0) * 100.0:+.0f}%"
+    print(line, flush=True)
+
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1.0:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def environment():
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'system': platform.platform(),
+        'cpus': os.cpu_count(),
+        'stand_in': IS_STAND_IN,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..algorithm.batch import aim_directions, predict_delta_ts
+from ..algorithm.data import Mic, Rifle, SceneData
+from ..algorithm.speed_sound import speed_sound
+
+FPS_TO_MPS = 0.3048
+
+LAYOUTS = ('RANDOM', 'LINE', 'GRID')
+TRUE_ORIGIN = (0.0, 0.0, 1.5)
+TRUE_ENDPOINT = (1000.0, 0.0, 1.5)
+TRUE_AMMO_SPEED = 2700
+NEAREST_MIC = 60.0  # Meters downrange. Calcrack is not useful within about 30 m of the rifle
+FARTHEST_MIC = 600.0
+MAX_SIDE_RATIO = 0.3  # Sideways offset per meter downrange. The cone's edge is near 0.46 at TRUE_AMMO_SPEED
+
+
+@dataclass
+class ScenarioSettings:
+    mic_count: int = 16
+    layout: str = 'RANDOM'
+    noise: float = 0.001  # Seconds of delta_t noise at confidence 3, doubled at 2 and quadrupled at 1
+    mis_picks: float = 0.0  # Share of mics whose delta_t is replaced by a random one
+    temp_f: float = 72.0
+    seed: int = 0
+
+
+def make_scene(settings, **scene_settings):
+    '''
+    A field of mics downrange of a known shot, with delta_t values predicted from that shot plus noise.
+    Every mic sits inside the mach cone, so none are dropped for a delta_t of 0. Returns (SceneData, true Rifle).
+    '''
+    rng = np.random.default_rng(settings.seed)
+    positions = mic_layout(settings.layout, settings.mic_count, rng)
+    truth = Rifle("Truth", TRUE_ORIGIN, TRUE_ENDPOINT, TRUE_AMMO_SPEED)
+
+    direction = aim_directions(truth.origin, truth.endpoint)
+    delta_ts = predict_delta_ts(positions, truth.origin, direction, TRUE_AMMO_SPEED * FPS_TO_MPS, speed_sound(settings.temp_f))[0]
+
+    confidences = rng.integers(1, 4, settings.mic_count)
+    delta_ts += rng.normal(0.0, 1.0, settings.mic_count) * settings.noise * 2.0 ** (3 - confidences)
+    mis_picked = rng.random(settings.mic_count) < settings.mis_picks
+    delta_ts[mis_picked] = rng.uniform(0.01, 0.5, int(mis_picked.sum()))
+    delta_ts = np.maximum(delta_ts, 0.001)  # A delta_t of 0 means "not a mic"
+
+    mics = [
+        Mic(f"Mic_{i:05d}", tuple(position), float(delta_t), int(confidence))
+        for i, (position, delta_t, confidence) in enumerate(zip(positions, delta_ts, confidences))
+    ]
+    return SceneData.from_mics(mics, temp_f=settings.temp_f, **scene_settings), truth
+
+
+def mic_layout(layout, count, rng):
+    '''(count, 3) mic positions: scattered at random, along one side of the path, or on a regular grid.'''
+    if layout == 'LINE':
+        x = np.linspace(NEAREST_MIC, FARTHEST_MIC, count)
+        y = x * MAX_SIDE_RATIO * 0.5
+    elif layout == 'GRID':
+        side = int(np.ceil(np.sqrt(count)))
+        u, w = np.meshgrid(np.linspace(0.0, 1.0, side), np.linspace(-1.0, 1.0, side))
+        x = NEAREST_MIC + u.ravel()[:count] * (FARTHEST_MIC - NEAREST_MIC)
+        y = w.ravel()[:count] * x * MAX_SIDE_RATIO
+    else:
+        x = rng.uniform(NEAREST_MIC, FARTHEST_MIC, count)
+        y = rng.uniform(-1.0, 1.0, count) * x * MAX_SIDE_RATIO
+    return np.column_stack((x, y, rng.uniform(0.0, 2.0, count)))
+
+
+def make_candidates(truth, count, position_spread=20.0, aim_spread=0.05, speed_spread=150.0, seed=0):
+    '''
+    count candidates scattered around the true shot, as arrays: origins (N, 3), endpoints (N, 3) and ammo speeds
+    (N,) in FPS. position_spread is meters, aim_spread radians and speed_spread FPS, all standard deviations.
+    '''
+    rng = np.random.default_rng(seed)
+    origins = np.asarray(truth.origin) + rng.normal(0.0, position_spread, (count, 3)) * (1.0, 1.0, 0.05)
+    heading = rng.normal(0.0, aim_spread, count)
+    elevation = rng.normal(0.0, aim_spread * 0.2, count)
+    aims = np.column_stack((np.cos(elevation) * np.cos(heading), np.cos(elevation) * np.sin(heading), np.sin(elevation)))
+    endpoints = origins + aims * 100.0
+    speeds = np.clip(TRUE_AMMO_SPEED + rng.normal(0.0, speed_spread, count), 1300.0, None)
+    return origins, endpoints, speeds
+
+
+def candidate_rifles(origins, endpoints, speeds, first=0):
+    return [
+        Rifle(f"Candidate_{first + i}", tuple(origin), tuple(endpoint), float(speed))
+        for i, (origin, endpoint, speed) in enumerate(zip(origins.tolist(), endpoints.tolist(), speeds.tolist()))
+    ]
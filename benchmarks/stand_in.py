@@ -0,0 +1,491 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+'''
+Just enough of bpy, bmesh and mathutils for the registry, the live-update handler and both simulation builders
+to run in plain Python. Data blocks are plain objects and meshes only count their vertices, so timings measure
+Calcrack's own work and leave out Blender's.
+'''
+
+import math
+import sys
+import types
+
+import numpy as np
+
+
+class Vector:
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self.values = np.array(values, dtype=np.float64).reshape(-1)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values.tolist())
+
+    def __getitem__(self, index):
+        return float(self.values[index])
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def __add__(self, other):
+        return Vector(self.values + np.asarray(other, dtype=np.float64))
+
+    def __sub__(self, other):
+        return Vector(self.values - np.asarray(other, dtype=np.float64))
+
+    def __mul__(self, scalar):
+        return Vector(self.values * float(scalar))
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        return np.array_equal(self.values, np.asarray(other, dtype=np.float64))
+
+    @property
+    def length(self):
+        return float(np.linalg.norm(self.values))
+
+    def normalized(self):
+        length = self.length
+        return Vector(self.values / length if length else self.values)
+
+    def to_track_quat(self, track='Z', up='Y'):
+        '''Only the 'Z', 'Y' pair the simulations use: +Z along this vector, +Y as close to world +Z as it gets.'''
+        z = self.normalized().values
+        up_axis = np.array((0.0, 0.0, 1.0)) if abs(z[2]) < 1.0 - 1e-9 else np.array((0.0, 1.0, 0.0))
+        x = np.cross(up_axis, z)
+        x /= np.linalg.norm(x)
+        return Quaternion(np.column_stack((x, np.cross(z, x), z)))
+
+
+class Quaternion:
+    '''Holds the rotation as a matrix, which is all to_euler needs.'''
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    def to_euler(self):
+        m = self.matrix
+        y = math.asin(-max(-1.0, min(1.0, m[2, 0])))
+        if abs(m[2, 0]) < 1.0 - 1e-9:
+            return (math.atan2(m[2, 1], m[2, 2]), y, math.atan2(m[1, 0], m[0, 0]))
+        return (0.0, y, math.atan2(-m[0, 1], m[1, 1]))
+
+
+class Matrix:
+    def __init__(self, values=None):
+        self.values = np.identity(4) if values is None else np.array(values, dtype=np.float64)
+
+    @classmethod
+    def Translation(cls, vector):
+        matrix = cls()
+        matrix.values[:3, 3] = tuple(vector)
+        return matrix
+
+    def identity(self):
+        self.values = np.identity(4)
+
+    @property
+    def translation(self):
+        return Vector(self.values[:3, 3])
+
+
+class ID:
+    def __init__(self, name):
+        self.name = name
+        self.users = 0
+
+    def as_pointer(self):
+        return id(self)
+
+    @property
+    def original(self):
+        return self
+
+
+class Mesh(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.vertex_count = 0
+
+    def update(self):
+        pass
+
+
+class Camera(ID):
+    pass
+
+
+class Collection(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.objects = CollectionObjects()
+        self.children = CollectionChildren()
+
+    @property
+    def children_recursive(self):
+        children = []
+        for child in self.children:
+            children.append(child)
+            children.extend(child.children_recursive)
+        return children
+
+
+class CollectionObjects(list):
+    def link(self, obj):
+        self.append(obj)
+
+    def unlink(self, obj):
+        self.remove(obj)
+
+
+class CollectionChildren(list):
+    def link(self, collection):
+        self.append(collection)
+        collection.users += 1
+
+
+class Object(ID):
+    '''The properties manager_properties registers on Object, at their defaults.'''
+    delta_t = 0.0
+    confidence = 3
+    is_outlier = False
+    aim_target = None
+    ammo_speed = 1600
+    duration_flight = .5
+    drag_model = 'G1'
+    ballistic_coeff = .45
+    aggregated_errors = 0.0
+    mean_error = 0.0
+    simulation_collection = None
+
+    def __init__(self, name, data=None):
+        super().__init__(name)
+        self._data = None
+        self.data = data
+        self.parent = None
+        self.matrix_parent_inverse = Matrix()
+        self.location = (0.0, 0.0, 0.0)
+        self.rotation_mode = 'XYZ'
+        self.rotation_euler = (0.0, 0.0, 0.0)
+        self.scale = (1.0, 1.0, 1.0)
+        self.display_type = 'TEXTURED'
+        self.animation_data = None
+        self.properties = {}
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        if self._data is not None:
+            self._data.users -= 1
+        if data is not None:
+            data.users += 1
+        self._data = data
+
+    @property
+    def type(self):
+        if isinstance(self._data, Mesh):
+            return 'MESH'
+        if isinstance(self._data, Camera):
+            return 'CAMERA'
+        return 'EMPTY'
+
+    @property
+    def location(self):
+        return self._location
+
+    @location.setter
+    def location(self, location):
+        self._location = Vector(location)
+
+    @property
+    def matrix_world(self):
+        return Matrix.Translation(self._location)  # Parents are ignored. Only rifles and mics are read back
+
+    def animation_data_create(self):
+        self.animation_data = AnimData()
+        return self.animation_data
+
+    def __contains__(self, key):
+        return key in self.properties
+
+    def __getitem__(self, key):
+        return self.properties[key]
+
+    def __setitem__(self, key, value):
+        self.properties[key] = value
+
+
+class AnimData:
+    def __init__(self):
+        self._action = None
+
+    @property
+    def action(self):
+        return self._action
+
+    @action.setter
+    def action(self, action):
+        if self._action is not None:
+            self._action.users -= 1
+        if action is not None:
+            action.users += 1
+        self._action = action
+
+
+class Action(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.id_root = 'OBJECT'
+        self.fcurves = FCurves()
+
+
+class FCurves(list):
+    def find(self, data_path, index=0):
+        for fcurve in self:
+            if fcurve.data_path == data_path and fcurve.array_index == index:
+                return fcurve
+        return None
+
+    def new(self, data_path, index=0):
+        fcurve = FCurve(data_path, index)
+        self.append(fcurve)
+        return fcurve
+
+
+class FCurve:
+    def __init__(self, data_path, index):
+        self.data_path = data_path
+        self.array_index = index
+        self.keyframe_points = KeyframePoints()
+
+    def update(self):
+        pass
+
+
+class KeyframePoints:
+    def __init__(self):
+        self.count = 0
+        self.attributes = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.attributes = {}
+
+    def add(self, count):
+        self.count += count
+
+    def foreach_set(self, attribute, values):
+        self.attributes[attribute] = np.array(values)
+
+
+class DataCollection(dict):
+    def __init__(self, kind, data=None):
+        super().__init__()
+        self.kind = kind
+        self.data = data  # Set where remove() also unlinks the block from wherever it is linked
+
+    def new(self, name, *args):
+        unique = name
+        suffix = 0
+        while unique in self:
+            suffix += 1
+            unique = f"{name}.{suffix:03d}"
+        block = self[unique] = self.kind(unique, *args)
+        return block
+
+    def remove(self, block):
+        if self.data is not None:
+            self.data.batch_remove([block])
+        else:
+            self.pop(block.name, None)
+
+    def __iter__(self):
+        return iter(list(self.values()))
+
+
+class BlendData:
+    def __init__(self):
+        self.filepath = ""
+        self.objects = DataCollection(Object)
+        self.meshes = DataCollection(Mesh)
+        self.cameras = DataCollection(Camera)
+        self.collections = DataCollection(Collection, self)
+        self.actions = DataCollection(Action)
+        self.scenes = []
+
+    def batch_remove(self, ids):
+        for block in ids:
+            for collection in (self.objects, self.meshes, self.cameras, self.collections, self.actions):
+                if collection.get(block.name) is block:
+                    collection.pop(block.name)
+            if isinstance(block, Object):
+                block.data = None
+                if block.animation_data:
+                    block.animation_data.action = None
+                for owner in self.collections.values():
+                    if block in owner.objects:
+                        owner.objects.unlink(block)
+            if isinstance(block, Collection):
+                for owner in list(self.collections.values()) + [scene.collection for scene in self.scenes]:
+                    if block in owner.children:
+                        owner.children.remove(block)
+
+
+class SceneObjects:
+    '''Every object linked anywhere under the scene collection. len() stays cheap however many objects there are.'''
+    def __init__(self, scene):
+        self.scene = scene
+
+    def collections(self):
+        return [self.scene.collection] + self.scene.collection.children_recursive
+
+    def __len__(self):
+        return sum(len(collection.objects) for collection in self.collections())
+
+    def __iter__(self):
+        seen = set()
+        for collection in self.collections():
+            for obj in collection.objects:
+                if id(obj) not in seen:
+                    seen.add(id(obj))
+                    yield obj
+
+
+class CalcrackSettings:
+    '''Scene.calcrack at the defaults manager_properties registers.'''
+    temp_f = 72
+    error_margin = 0.0
+    print_to_terminal = False
+    air_drag = False
+    scoring = 'ABSOLUTE'
+    robust_scale = .010
+    profiling = False
+    live_update = True
+    live_update_interval = .05
+    record_history = True
+
+
+class Scene(ID):
+    def __init__(self, name="Scene"):
+        super().__init__(name)
+        self.collection = Collection("Scene Collection")
+        self.objects = SceneObjects(self)
+        self.calcrack = CalcrackSettings()
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+
+    def frame_set(self, frame):
+        self.frame_current = frame
+
+
+class ViewLayer:
+    def update(self):
+        pass
+
+
+class Update:
+    def __init__(self, id_data):
+        self.id = id_data
+
+
+class Depsgraph:
+    '''What the live-update handler receives, for the objects the caller says changed.'''
+    def __init__(self, objects):
+        self.updates = [Update(obj) for obj in objects]
+
+
+class Timers:
+    def __init__(self):
+        self.functions = []
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self.functions.append(function)
+
+    def unregister(self, function):
+        self.functions.remove(function)
+
+    def is_registered(self, function):
+        return function in self.functions
+
+
+class BMesh:
+    def __init__(self):
+        self.vertex_count = 0
+
+    def to_mesh(self, mesh):
+        mesh.vertex_count = self.vertex_count
+
+    def free(self):
+        pass
+
+
+def create_uvsphere(bm, u_segments, v_segments, radius, **kwargs):
+    bm.vertex_count += u_segments * (v_segments - 1) + 2
+    return {}
+
+
+def create_cone(bm, segments, cap_ends=False, **kwargs):
+    bm.vertex_count += segments + 1 + (1 if cap_ends else 0)
+    return {}
+
+
+def persistent(function):
+    return function
+
+
+def module(name, **attributes):
+    result = types.ModuleType(name)
+    result.__dict__.update(attributes)
+    return result
+
+
+def install():
+    '''Puts the stand-ins in sys.modules unless Blender's own modules import. Returns True when the stand-ins are used.'''
+    try:
+        import bpy  # noqa: F401
+        return False
+    except ImportError:
+        pass
+
+    handlers = module(
+        'bpy.app.handlers',
+        persistent=persistent,
+        depsgraph_update_post=[],
+        load_pre=[],
+        load_post=[],
+        undo_post=[],
+        redo_post=[]
+    )
+    app = module('bpy.app', handlers=handlers, timers=Timers(), tempdir="")
+    bpy_types = module('bpy.types', ID=ID, Object=Object, Mesh=Mesh, Collection=Collection, Scene=Scene)
+    scene = Scene()
+    context = types.SimpleNamespace(scene=scene, view_layer=ViewLayer())
+    data = BlendData()
+    data.scenes.append(scene)
+    bpy = module('bpy', app=app, types=bpy_types, data=data, context=context)
+
+    ops = module('bmesh.ops', create_uvsphere=create_uvsphere, create_cone=create_cone)
+    bmesh = module('bmesh', new=BMesh, ops=ops)
+    mathutils = module('mathutils', Vector=Vector, Matrix=Matrix, Quaternion=Quaternion)
+
+    sys.modules.update({
+        'bpy': bpy,
+        'bpy.app': app,
+        'bpy.app.handlers': handlers,
+        'bpy.types': bpy_types,
+        'bmesh': bmesh,
+        'bmesh.ops': ops,
+        'mathutils': mathutils,
+    })
+    return True
@@ -0,0 +1,228 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+'''
+Each suite yields Cases. A Case's run() does one timed unit of work and returns the seconds it took, so setup
+that has to happen on every repeat (like building a million Rifles) stays out of the timing.
+
+Import this after stand_in.install(), since the live-update and simulation suites import bpy.
+'''
+
+import time
+from dataclasses import dataclass, field
+
+import bpy
+
+from .scenarios import ScenarioSettings, candidate_rifles, make_candidates, make_scene
+from .stand_in import Depsgraph
+from ..algorithm.algorithm import Algorithm, score_rifles
+from ..algorithm.compare import compare
+from ..algorithm.data import Rifle, SceneData
+from ..manager_adapter import RESULT_CACHE
+from ..manager_events import depsgraph_update_handler
+from ..registry.registry import REGISTRY
+from ..simulate.pool import clear_simulation
+from ..simulate.simulate import Simulate
+from ..simulate_advanced.simulate_advanced import SimulateAdvanced
+
+MAX_CHUNK_ELEMENTS = 2**21  # Candidates x mics per score_rifles call, so a million candidates fit in memory
+MAX_CHUNK_CANDIDATES = 100_000
+SCENE_SETTINGS = {  # Live update evaluates every change right away, and nothing is written to disk or the terminal
+    'live_update': True,
+    'live_update_interval': 0.0,
+    'record_history': False,
+    'print_to_terminal': False,
+}
+
+PLANS = {
+    'quick': {
+        'algorithm': [4, 100, 1_000],
+        'algorithm_drag': [4, 100],
+        'compare': [4, 100, 1_000],
+        'candidates': [(4, 1), (4, 10_000), (100, 1_000), (1_000, 100)],
+        'live_update': [(4, 1), (100, 10)],
+        'simulate': [.5],
+        'simulate_advanced': [.5],
+    },
+    'full': {
+        'algorithm': [4, 16, 100, 1_000, 10_000],
+        'algorithm_drag': [4, 100, 1_000],
+        'compare': [4, 16, 100, 1_000, 10_000],
+        'candidates': [(4, 1), (4, 1_000), (4, 1_000_000), (16, 100_000), (100, 10_000), (1_000, 1_000), (10_000, 100)],
+        'live_update': [(4, 1), (100, 10), (1_000, 50), (10_000, 50)],
+        'simulate': [.5, 2.0],
+        'simulate_advanced': [.5, 2.0],
+    },
+}
+
+
+@dataclass
+class Case:
+    suite: str
+    params: dict
+    run: object  # () -> seconds
+    teardown: object = None
+    name: str = field(init=False)
+
+    def __post_init__(self):
+        self.name = f"{self.suite}/" + ",".join(f"{key}={value}" for key, value in self.params.items())
+
+
+def stopwatch(function):
+    def run():
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+    return run
+
+
+def algorithm_suite(sizes, settings, air_drag=False):
+    suite = 'algorithm_drag' if air_drag else 'algorithm'
+    for mic_count in sizes:
+        scene, truth = make_scene(ScenarioSettings(mic_count=mic_count, **settings), air_drag=air_drag)
+        yield Case(suite, {'mics': mic_count}, stopwatch(lambda scene=scene, truth=truth: Algorithm(scene, truth).execute()))
+
+
+def compare_suite(sizes, settings):
+    for mic_count in sizes:
+        scene, truth = make_scene(ScenarioSettings(mic_count=mic_count, **settings))
+        Result = Algorithm(scene, truth).execute()
+        yield Case('compare', {'mics': mic_count}, stopwatch(lambda Result=Result: compare(Result)))
+
+
+def candidates_suite(sizes, settings):
+    '''score_rifles over every candidate, in chunks. Building the Rifles is setup, turning them into arrays is not.'''
+    for mic_count, candidate_count in sizes:
+        scene, truth = make_scene(ScenarioSettings(mic_count=mic_count, **settings))
+        arrays = make_candidates(truth, candidate_count, seed=settings['seed'])
+        chunk = max(1, min(MAX_CHUNK_CANDIDATES, MAX_CHUNK_ELEMENTS // mic_count))
+        chunks = [candidate_rifles(*(array[start:start + chunk] for array in arrays), first=start)
+                  for start in range(0, candidate_count, chunk)] if candidate_count <= chunk else None
+
+        def run(scene=scene, arrays=arrays, chunk=chunk, chunks=chunks):
+            seconds = 0.0
+            for index, start in enumerate(range(0, len(arrays[2]), chunk)):
+                rifles = chunks[index] if chunks else candidate_rifles(*(array[start:start + chunk] for array in arrays), first=start)
+                begin = time.perf_counter()
+                score_rifles(scene, rifles)
+                seconds += time.perf_counter() - begin
+            return seconds
+
+        yield Case('candidates', {'mics': mic_count, 'candidates': candidate_count}, run)
+
+
+def live_update_suite(sizes, settings, is_stand_in):
+    '''
+    The depsgraph handler for one moved rifle (only that rifle is re-evaluated) and for one moved mic (every rifle
+    is). Every move goes somewhere new, so the result cache always misses.
+    '''
+    for mic_count, rifle_count in sizes:
+        scene_data, truth = make_scene(ScenarioSettings(mic_count=mic_count, **settings))
+        origins, endpoints, speeds = make_candidates(truth, rifle_count, seed=settings['seed'])
+        scene = bpy.context.scene
+        created, previous = build_scene(scene, scene_data, candidate_rifles(origins, endpoints, speeds))
+        mics = [obj for obj in created if obj.type == 'CAMERA']
+        rifles = [obj for obj in created if obj.type == 'MESH']
+
+        params = {'mics': mic_count, 'rifles': rifle_count}
+        yield Case('live_update', dict(params, moved='rifle'), mover(scene, rifles[0], is_stand_in))
+        teardown = lambda created=created, previous=previous: remove_scene(scene, created, previous)
+        yield Case('live_update', dict(params, moved='mic'), mover(scene, mics[0], is_stand_in), teardown=teardown)
+
+
+def mover(scene, obj, is_stand_in):
+    '''Nudges obj upward each call and times the live update that follows.'''
+    def run():
+        location = tuple(obj.location)
+        obj.location = (location[0], location[1], location[2] + 0.01)
+        start = time.perf_counter()
+        if is_stand_in:
+            depsgraph_update_handler(scene, Depsgraph([obj]))
+        else:
+            bpy.context.view_layer.update()  # Runs the add-on's own handler
+        return time.perf_counter() - start
+    return run
+
+
+def simulation_suite(simulation, sizes, settings):
+    '''One simulation build per call. Every call after the first reuses the pooled objects, as a re-run does in Blender.'''
+    suite = 'simulate' if simulation is Simulate else 'simulate_advanced'
+    scene = bpy.context.scene
+    scene_data, truth = make_scene(ScenarioSettings(mic_count=4, **settings))
+    for duration in sizes:
+        rifle = Rifle(truth.name, truth.origin, truth.endpoint, truth.ammo_speed, duration_flight=duration)
+        created, previous = build_scene(scene, SceneData(), [rifle])
+        obj = next(obj for obj in created if obj.type == 'MESH')
+        Result = Algorithm(scene_data, rifle).execute()
+
+        def teardown(obj=obj, created=created, previous=previous):
+            clear_simulation(obj)
+            remove_scene(scene, created, previous)
+
+        run = stopwatch(lambda obj=obj, Result=Result: simulation(scene, obj, Result).execute())
+        yield Case(suite, {'duration': duration}, run, teardown)
+
+
+def build_scene(scene, scene_data, rifles):
+    '''
+    Blender objects for the SceneData's mics and each Rifle, under SCENE_SETTINGS. Works against Blender itself
+    (with Calcrack enabled) as well as against the stand-in. Returns the objects and the scene settings they
+    replaced, for remove_scene to restore.
+    '''
+    settings = scene.calcrack
+    previous = {name: getattr(settings, name) for name in SCENE_SETTINGS}
+    for name, value in SCENE_SETTINGS.items():
+        setattr(settings, name, value)
+
+    created = []
+    for mic in scene_data.mics():
+        obj = bpy.data.objects.new(mic.name, bpy.data.cameras.new(mic.name))
+        obj.location = mic.position
+        obj.delta_t = mic.delta_t
+        obj.confidence = mic.confidence
+        created.append(obj)
+
+    for rifle in rifles:
+        target = bpy.data.objects.new(f"{rifle.name}_Target", None)
+        target.location = rifle.endpoint
+        obj = bpy.data.objects.new(rifle.name, bpy.data.meshes.new(rifle.name))
+        obj.location = rifle.origin
+        obj.aim_target = target
+        obj.ammo_speed = int(rifle.ammo_speed)
+        obj.duration_flight = rifle.duration_flight
+        created.extend((obj, target))
+
+    for obj in created:
+        scene.collection.objects.link(obj)
+
+    REGISTRY.invalidate()
+    RESULT_CACHE.clear()
+    return created, previous
+
+
+def remove_scene(scene, created, previous):
+    '''Deletes what build_scene created and gives the user their scene settings back.'''
+    bpy.data.batch_remove(set(created) | {obj.data for obj in created if obj.data is not None})
+    for name, value in previous.items():
+        setattr(scene.calcrack, name, value)
+    REGISTRY.invalidate()
+    RESULT_CACHE.clear()
+
+
+def plan_cases(plan, suites, settings, is_stand_in):
+    sizes = PLANS[plan]
+    builders = {
+        'algorithm': lambda: algorithm_suite(sizes['algorithm'], settings),
+        'algorithm_drag': lambda: algorithm_suite(sizes['algorithm_drag'], settings, air_drag=True),
+        'compare': lambda: compare_suite(sizes['compare'], settings),
+        'candidates': lambda: candidates_suite(sizes['candidates'], settings),
+        'live_update': lambda: live_update_suite(sizes['live_update'], settings, is_stand_in),
+        'simulate': lambda: simulation_suite(Simulate, sizes['simulate'], settings),
+        'simulate_advanced': lambda: simulation_suite(SimulateAdvanced, sizes['simulate_advanced'], settings),
+    }
+    for suite in suites:
+        yield from builders[suite]()
+
+
+SUITES = tuple(PLANS['quick'])
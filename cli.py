@@ -0,0 +1,198 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+'''
+Evaluate Calcrack scenarios without the Blender UI.
+
+    python -m calcrack.cli scenarios.jsonl -o results.jsonl
+    blender -b --python calcrack/cli.py -- scenarios.csv -o results.csv
+
+Scenarios are read from JSON (one scenario or a list), JSON Lines (one scenario per line) or CSV, and streamed
+one at a time, so files with thousands of scenarios never load fully. A JSON scenario looks like:
+
+    {
+        "name": "Case 1",
+        "temp_f": 72,
+        "error_margin": 0.0,
+        "scoring": "ABSOLUTE",
+        "mics": [{"name": "Mic_A", "position": [10, 4, 0], "delta_t": 0.084, "confidence": 3}],
+        "candidates": [{"name": "Rifle_1", "origin": [-120, 0, 2], "target": [0, 0, 1], "ammo_speed": 2700}]
+    }
+
+CSV files hold one mic or candidate per row, grouped by scenario:
+
+    scenario,kind,name,x,y,z,delta_t,confidence,target_x,target_y,target_z,ammo_speed,temp_f,error_margin
+
+"scoring" is optional: ABSOLUTE (default), HUBER or TUKEY, with "robust_scale" in seconds.
+
+Results list every candidate of every scenario, ranked by aggregated error, as JSON Lines or CSV.
+'''
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+if __name__ == '__main__' and not __package__:  # Run as a script, e.g. blender -b --python cli.py
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    __package__ = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+
+from .algorithm.leaderboard import rank_rifles
+from .algorithm.data import Mic, Rifle, SceneData, DEFAULT_AMMO_SPEED, DEFAULT_CONFIDENCE, DEFAULT_TEMP_F
+from .algorithm.robust import DEFAULT_ROBUST_SCALE, DEFAULT_SCORING
+
+DEFAULT_ERROR_MARGIN = 0.0
+
+RESULT_FIELDS = ['scenario', 'rank', 'candidate', 'aggregated_error', 'mean_error', 'worst_mic', 'worst_error']
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    with open_output(args.output) as output:
+        write = result_writer(output, output_format(args.output, args.format))
+        for scenario in read_scenarios(args.scenarios):
+            for result in evaluate_scenario(scenario, args.top):
+                write(result)
+
+
+def parse_args(argv):
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]  # Blender's own args come before --
+
+    parser = argparse.ArgumentParser(prog="calcrack", description="Rank Calcrack candidate rifles for scenario files.")
+    parser.add_argument('scenarios', nargs='+', help="JSON, JSON Lines (.jsonl) or CSV scenario files")
+    parser.add_argument('-o', '--output', default='-', help="Results file, .jsonl or .csv. Defaults to JSON Lines on stdout")
+    parser.add_argument('-f', '--format', choices=['jsonl', 'csv'], help="Results format, overriding the output extension")
+    parser.add_argument('-n', '--top', type=int, default=0, help="Only keep the best N candidates per scenario")
+    return parser.parse_args(argv)
+
+
+def read_scenarios(paths):
+    for path in paths:
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            yield from read_csv_scenarios(path)
+        elif extension in ('.jsonl', '.ndjson'):
+            yield from read_jsonl_scenarios(path)
+        else:
+            yield from read_json_scenarios(path)
+
+
+def read_json_scenarios(path):
+    with open(path) as file:
+        data = json.load(file)
+    yield from (data if isinstance(data, list) else [data])
+
+
+def read_jsonl_scenarios(path):
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_csv_scenarios(path):
+    '''Rows are grouped by their scenario column. A scenario is yielded as soon as the next one starts.'''
+    scenario = None
+    with open(path, newline='') as file:
+        for row in csv.DictReader(file):
+            name = row.get('scenario') or os.path.basename(path)
+            if scenario is None or scenario['name'] != name:
+                if scenario is not None:
+                    yield scenario
+                scenario = {'name': name, 'mics': [], 'candidates': []}
+
+            for key in ('temp_f', 'error_margin'):
+                if row.get(key):
+                    scenario[key] = float(row[key])
+
+            position = [float(row['x']), float(row['y']), float(row['z'])]
+            if row['kind'].strip().lower() == 'mic':
+                scenario['mics'].append({
+                    'name': row['name'],
+                    'position': position,
+                    'delta_t': float(row['delta_t']),
+                    'confidence': int(row.get('confidence') or DEFAULT_CONFIDENCE),
+                })
+            else:
+                scenario['candidates'].append({
+                    'name': row['name'],
+                    'origin': position,
+                    'target': [float(row['target_x']), float(row['target_y']), float(row['target_z'])],
+                    'ammo_speed': float(row.get('ammo_speed') or DEFAULT_AMMO_SPEED),
+                })
+
+    if scenario is not None:
+        yield scenario
+
+
+def evaluate_scenario(scenario, top=0):
+    '''Scores every candidate of one scenario in a single batched pass, ranked best first.'''
+    scene = scenario_data(scenario)
+    rifles = [
+        Rifle(
+            name=candidate.get('name', str(i)),
+            origin=tuple(candidate['origin']),
+            endpoint=tuple(candidate['target']),
+            ammo_speed=float(candidate.get('ammo_speed', DEFAULT_AMMO_SPEED))
+        )
+        for i, candidate in enumerate(scenario.get('candidates', []))
+    ]
+    return [
+        {
+            'scenario': scenario.get('name', ''),
+            'rank': standing.rank,
+            'candidate': standing.rifle,
+            'aggregated_error': standing.aggregated_error,
+            'mean_error': standing.mean_error,
+            'worst_mic': standing.worst_mic,
+            'worst_error': standing.worst_error,
+        }
+        for standing in rank_rifles(scene, rifles, top)
+    ]
+
+
+def scenario_data(scenario):
+    mics = [
+        Mic(
+            name=mic['name'],
+            position=tuple(mic['position']),
+            delta_t=float(mic['delta_t']),
+            confidence=int(mic.get('confidence', DEFAULT_CONFIDENCE))
+        )
+        for mic in scenario.get('mics', [])
+    ]
+    return SceneData.from_mics(
+        mics,
+        temp_f=scenario.get('temp_f', DEFAULT_TEMP_F),
+        error_margin=scenario.get('error_margin', DEFAULT_ERROR_MARGIN),
+        scoring=scenario.get('scoring', DEFAULT_SCORING).upper(),
+        robust_scale=float(scenario.get('robust_scale', DEFAULT_ROBUST_SCALE))
+    )
+
+
+def output_format(path, format):
+    if format:
+        return format
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def open_output(path):
+    if path == '-':
+        return os.fdopen(os.dup(sys.stdout.fileno()), 'w', newline='')
+    return open(path, 'w', newline='')
+
+
+def result_writer(output, format):
+    if format == 'csv':
+        writer = csv.DictWriter(output, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        return writer.writerow
+    return lambda result: output.write(json.dumps(result) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import sqlite3
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+FLUSH_ROWS = 512  # Pending rows that force a flush even before the timer
+
+TABLE = '''
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    rifle TEXT NOT NULL,
+    ox REAL NOT NULL, oy REAL NOT NULL, oz REAL NOT NULL,
+    ex REAL NOT NULL, ey REAL NOT NULL, ez REAL NOT NULL,
+    ammo_speed REAL NOT NULL,
+    temp_f REAL NOT NULL,
+    error_margin REAL NOT NULL,
+    aggregated_errors REAL NOT NULL,
+    mean_error REAL NOT NULL,
+    mic_hash TEXT NOT NULL,
+    residuals BLOB NOT NULL,
+    scoring TEXT NOT NULL DEFAULT '',
+    robust_scale REAL NOT NULL DEFAULT 0.0
+);
+'''
+
+# Files written before scoring was recorded. Their rows get scoring '', so best() and nearby() never compare them
+UPGRADE = '''
+ALTER TABLE candidates ADD COLUMN scoring TEXT NOT NULL DEFAULT '';
+ALTER TABLE candidates ADD COLUMN robust_scale REAL NOT NULL DEFAULT 0.0;
+DROP INDEX IF EXISTS candidates_best;
+DROP INDEX IF EXISTS candidates_position;
+'''
+
+INDEXES = '''
+CREATE INDEX IF NOT EXISTS candidates_best_scored ON candidates (mic_hash, scoring, robust_scale, mean_error);
+CREATE INDEX IF NOT EXISTS candidates_position_scored ON candidates (mic_hash, scoring, robust_scale, ox, oy);
+CREATE INDEX IF NOT EXISTS candidates_rifle ON candidates (rifle, created);
+'''
+
+COLUMNS = (
+    'created, rifle, ox, oy, oz, ex, ey, ez, ammo_speed, temp_f, error_margin, '
+    'aggregated_errors, mean_error, mic_hash, residuals, scoring, robust_scale'
+)
+
+
+@dataclass
+class HistoryEntry:
+    created: float
+    rifle: str
+    origin: tuple
+    endpoint: tuple
+    ammo_speed: float
+    temp_f: float
+    error_margin: float
+    aggregated_errors: float
+    mean_error: float
+    mic_hash: str
+    residuals: np.ndarray
+    scoring: str
+    robust_scale: float
+
+
+def scoring_key(scoring, robust_scale):
+    '''Errors are only comparable under the same loss. The scale doesn't change absolute errors, so it is stored as 0.'''
+    return scoring, 0.0 if scoring == 'ABSOLUTE' else float(robust_scale)
+
+
+class HistoryStore:
+    '''
+    Context: Every evaluation's result used to be thrown away, except the last one written to the rifle.
+
+    Solution: Each evaluated candidate (pose, speed, settings, per-mic residuals and totals) is appended to an
+    indexed SQLite file. Rows wait in memory and are written in one transaction per flush, so recording adds no
+    disk latency to live update. Queries flush first, so they always see every row.
+
+    Huber and Tukey errors are losses, not seconds, so best() and nearby() only rank rows scored the same way.
+    '''
+    def __init__(self):
+        self.path = None
+        self.connection = None
+        self.pending = []
+
+    def open(self, path):
+        if path == self.path:
+            return
+        self.close()
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(TABLE)
+        columns = {row[1] for row in self.connection.execute('PRAGMA table_info(candidates)')}
+        if 'scoring' not in columns:
+            self.connection.executescript(UPGRADE)
+        self.connection.executescript(INDEXES)
+        self.path = path
+
+    def close(self):
+        if self.connection is None:
+            return
+        self.flush()
+        self.connection.close()
+        self.connection = None
+        self.path = None
+
+    def add(self, rifle, origin, endpoint, ammo_speed, temp_f, error_margin, aggregated_errors, mean_error, mic_hash, residuals,
+            scoring, robust_scale):
+        self.pending.append((
+            time.time(), rifle, *map(float, origin), *map(float, endpoint), float(ammo_speed), float(temp_f),
+            float(error_margin), float(aggregated_errors), float(mean_error), mic_hash,
+            np.ascontiguousarray(residuals, dtype=np.float64).tobytes(), *scoring_key(scoring, robust_scale)
+        ))
+        if len(self.pending) >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.pending or self.connection is None:
+            return
+        with self.connection:
+            self.connection.executemany(f'INSERT INTO candidates ({COLUMNS}) VALUES ({", ".join("?" * 17)})', self.pending)
+        self.pending = []
+
+    def best(self, mic_hash, scoring, robust_scale, limit=10):
+        '''Smallest mean error first, among candidates scored the same way against these exact mics.'''
+        return self.query(
+            'WHERE mic_hash = ? AND scoring = ? AND robust_scale = ? ORDER BY mean_error, id LIMIT ?',
+            (mic_hash, *scoring_key(scoring, robust_scale), limit)
+        )
+
+    def nearby(self, mic_hash, scoring, robust_scale, origin, radius, limit=10):
+        '''Candidates whose rifle stood within radius of origin, best first.'''
+        x, y, z = map(float, origin)
+        entries = self.query(
+            'WHERE mic_hash = ? AND scoring = ? AND robust_scale = ? '
+            'AND ox BETWEEN ? AND ? AND oy BETWEEN ? AND ? AND oz BETWEEN ? AND ? ORDER BY mean_error, id',
+            (mic_hash, *scoring_key(scoring, robust_scale), x - radius, x + radius, y - radius, y + radius, z - radius, z + radius)
+        )
+        radius_sq = radius * radius
+        entries = [
+            entry for entry in entries
+            if (entry.origin[0] - x) ** 2 + (entry.origin[1] - y) ** 2 + (entry.origin[2] - z) ** 2 <= radius_sq
+        ]
+        return entries[:limit]
+
+    def rifle_history(self, rifle, limit=10):
+        '''Most recent first.'''
+        return self.query('WHERE rifle = ? ORDER BY created DESC, id DESC LIMIT ?', (rifle, limit))
+
+    def count(self):
+        self.flush()
+        return self.connection.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+
+    def query(self, clause, parameters):
+        self.flush()
+        rows = self.connection.execute(f'SELECT {COLUMNS} FROM candidates {clause}', parameters)
+        return [
+            HistoryEntry(
+                created, rifle, (ox, oy, oz), (ex, ey, ez), ammo_speed, temp_f, error_margin,
+                aggregated_errors, mean_error, mic_hash, np.frombuffer(residuals, dtype=np.float64), scoring, robust_scale
+            )
+            for created, rifle, ox, oy, oz, ex, ey, ez, ammo_speed, temp_f, error_margin,
+                aggregated_errors, mean_error, mic_hash, residuals, scoring, robust_scale in rows
+        ]
+
+
+HISTORY = HistoryStore()
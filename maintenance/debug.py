@@ -2,20 +2,23 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import bpy
 from .rainbow import *
 
 
-def debug_main(Algorithm):
-    if not bpy.context.scene.calcrack.print_to_terminal:
-        return
-    
-    print(f"\n{BLUE}#########################\n# Firing...\n#########################")
-    print(f"{BLUE}Velocity (FPS): {RESET}{Algorithm.round_velocity_fps}")
-    print(f"{BLUE}Rifle origin: {RESET}{tuple(round(v, 2) for v in Algorithm.rifle_origin_world)}")
-    print(f"{BLUE}Rifle endpoint: {RESET}{tuple(round(v, 2) for v in Algorithm.rifle_endpoint)}")
+def debug_main(evaluation):
+    print(f"\n{BLUE}#########################\n# Firing {evaluation.rifle}...\n#########################")
+    print(f"{BLUE}Velocity (FPS): {RESET}{evaluation.ammo_speed:g}")
+    print(f"{BLUE}Rifle origin: {RESET}{tuple(round(v, 2) for v in evaluation.origin)}")
+    print(f"{BLUE}Rifle endpoint: {RESET}{tuple(round(v, 2) for v in evaluation.endpoint)}")
 
 
 def debug_each(mic_name, error, actual_dt, pred_dt):
-    # Return early for scene toggle outside loop
-    print(f"{BLUE}Error: {RED}{error:.3f}s{BLUE}. Actual: {RESET}{actual_dt:.3f}s{BLUE}. Predicted: {RESET}{pred_dt:.3f}s{BLUE}.{RESET} ---> {RESET}{mic_name}")
\ No newline at end of file
+    print(f"{BLUE}Error: {RED}{error:.3f}s{BLUE}. Actual: {RESET}{actual_dt:.3f}s{BLUE}. Predicted: {RESET}{pred_dt:.3f}s{BLUE}.{RESET} ---> {RESET}{mic_name}")
+
+
+def debug_skipped(skipped, dropped, lines_per_second, path):
+    where = f" They are all in {path}." if path else ""
+    if skipped:
+        print(f"{YELLOW}Print Mode skipped {skipped} lines to stay under {lines_per_second} per second.{where}{RESET}")
+    if dropped:
+        print(f"{YELLOW}Print Mode fell behind and dropped its {dropped} oldest evaluations.{RESET}")
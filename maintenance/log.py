@@ -0,0 +1,165 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import atexit
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from .debug import debug_each, debug_main, debug_skipped
+
+FLUSH_INTERVAL = 0.25  # Seconds between background writes
+MAX_BUFFERED = 4096  # Evaluations waiting to be written. The oldest are dropped beyond this
+DEFAULT_LINES_PER_SECOND = 200
+
+
+@dataclass
+class Evaluation:
+    created: float
+    rifle: str
+    origin: tuple
+    endpoint: tuple
+    ammo_speed: float
+    mic_names: tuple
+    actual: np.ndarray
+    predicted: np.ndarray
+    errors: np.ndarray
+
+    def records(self):
+        '''One JSON-ready dict per mic.'''
+        return [
+            {
+                'time': self.created,
+                'rifle': self.rifle,
+                'origin': self.origin,
+                'endpoint': self.endpoint,
+                'ammo_speed': self.ammo_speed,
+                'mic': mic_name,
+                'actual': actual,
+                'predicted': predicted,
+                'error': error,
+            }
+            for mic_name, actual, predicted, error
+            in zip(self.mic_names, self.actual.tolist(), self.predicted.tolist(), self.errors.tolist())
+        ]
+
+
+class PrintLog:
+    '''
+    Context: Print Mode used to print a colored line per mic per evaluation, inside the live-update loop, so a
+    drag with many mics spent most of its time in the terminal.
+
+    Solution: add() only snapshots the evaluation into a bounded in-memory buffer. A background thread drains it
+    every FLUSH_INTERVAL, appending every per-mic record to a JSON Lines file and printing to the terminal at most
+    lines_per_second lines. Lines over the limit are counted and summarized instead of printed.
+    '''
+    def __init__(self):
+        self.terminal = True
+        self.path = ''
+        self.lines_per_second = DEFAULT_LINES_PER_SECOND
+        self.buffer = deque(maxlen=MAX_BUFFERED)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.file = None
+        self.file_path = ''
+        self.allowance = float(DEFAULT_LINES_PER_SECOND)
+        self.last_refill = time.monotonic()
+
+    def configure(self, terminal=True, path='', lines_per_second=DEFAULT_LINES_PER_SECOND):
+        self.terminal = terminal
+        self.path = path
+        self.lines_per_second = max(1, int(lines_per_second))
+
+    def add(self, rifle, origin, endpoint, ammo_speed, mic_names, actual, predicted, errors):
+        '''Copies what it needs, since the registry's mic arrays are patched in place after this returns.'''
+        evaluation = Evaluation(
+            time.time(), rifle, tuple(map(float, origin)), tuple(map(float, endpoint)), float(ammo_speed), tuple(mic_names),
+            np.array(actual, dtype=np.float64), np.array(predicted, dtype=np.float64), np.array(errors, dtype=np.float64)
+        )
+        with self.lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(evaluation)
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="calcrack-print-log", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while not self.wake.wait(FLUSH_INTERVAL):
+            with self.lock:
+                if not self.buffer and not self.dropped:
+                    self.thread = None  # Idle. The next add() starts a new thread
+                    return
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            evaluations = list(self.buffer)
+            self.buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+        if not evaluations and not dropped:
+            return
+
+        if self.path:
+            self.write_file(evaluations)
+        if self.terminal:
+            self.write_terminal(evaluations, dropped)
+
+    def write_file(self, evaluations):
+        if self.file is None or self.file_path != self.path:
+            self.close_file()
+            self.file = open(self.path, 'a')
+            self.file_path = self.path
+        self.file.write(''.join(json.dumps(record) + '\n' for evaluation in evaluations for record in evaluation.records()))
+        self.file.flush()
+
+    def write_terminal(self, evaluations, dropped):
+        now = time.monotonic()
+        self.allowance = min(float(self.lines_per_second), self.allowance + (now - self.last_refill) * self.lines_per_second)
+        self.last_refill = now
+
+        skipped = 0
+        for evaluation in evaluations:
+            mic_count = len(evaluation.mic_names)
+            if self.allowance < 2.0:
+                skipped += 1 + mic_count
+                continue
+
+            shown = min(mic_count, int(self.allowance) - 1)  # An evaluation with more mics than the limit still shows its first ones
+            self.allowance -= 1 + shown
+            skipped += mic_count - shown
+            debug_main(evaluation)
+            for i in range(shown):
+                debug_each(evaluation.mic_names[i], evaluation.errors[i], evaluation.actual[i], evaluation.predicted[i])
+
+        if skipped or dropped:
+            debug_skipped(skipped, dropped, self.lines_per_second, self.path)
+
+    def close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.file_path = ''
+
+    def close(self):
+        '''Writes whatever is still buffered and stops the thread.'''
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.wake.set()
+            thread.join()
+            self.wake.clear()
+        self.flush()
+        self.close_file()
+
+
+LOG = PrintLog()
+atexit.register(LOG.close)
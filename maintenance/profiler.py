@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import functools
+import json
+import time
+
+import numpy as np
+
+RING_SIZE = 2048  # Most recent timings kept per span
+HISTOGRAM_EDGES = np.logspace(-6, 1, 15)  # 1 microsecond to 10 seconds, two bins per decade
+SPARK = " ▁▂▃▄▅▆▇█"
+
+
+class Profiler:
+    '''
+    Context: When live update lags, we need to know whether the time goes to scene scans, the math, printing
+    or depsgraph churn.
+
+    Solution: Functions decorated with timed() report their duration here while profiling is on. Each span keeps
+    its latest RING_SIZE durations in a fixed numpy ring, so memory stays flat over a long session. When off, a
+    timed call costs one attribute check.
+    '''
+    def __init__(self):
+        self.enabled = False
+        self.spans = {}
+
+    def record(self, name, seconds):
+        span = self.spans.get(name)
+        if span is None:
+            span = self.spans[name] = {'durations': np.zeros(RING_SIZE), 'count': 0}
+        span['durations'][span['count'] % RING_SIZE] = seconds
+        span['count'] += 1
+
+    def clear(self):
+        self.spans = {}
+
+    def stats(self):
+        '''Per span, slowest mean first: calls, mean/p50/p95/max in seconds and histogram counts over HISTOGRAM_EDGES.'''
+        stats = []
+        for name, span in self.spans.items():
+            durations = span['durations'][:min(span['count'], RING_SIZE)]
+            stats.append({
+                'name': name,
+                'count': span['count'],
+                'mean': float(durations.mean()),
+                'p50': float(np.percentile(durations, 50)),
+                'p95': float(np.percentile(durations, 95)),
+                'max': float(durations.max()),
+                'histogram': np.histogram(np.clip(durations, HISTOGRAM_EDGES[0], HISTOGRAM_EDGES[-1]), HISTOGRAM_EDGES)[0].tolist(),
+            })
+        return sorted(stats, key=lambda stat: stat['mean'], reverse=True)
+
+    def export_json(self, path):
+        with open(path, 'w') as file:
+            json.dump({
+                'created': time.time(),
+                'ring_size': RING_SIZE,
+                'histogram_edges': HISTOGRAM_EDGES.tolist(),
+                'spans': self.stats(),
+            }, file, indent=2)
+
+
+PROFILER = Profiler()
+
+
+def timed(name):
+    '''Decorator that reports every call's duration to PROFILER under name, while profiling is on.'''
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                PROFILER.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def sparkline(histogram):
+    '''Histogram counts as one block character per bin, for a UI label.'''
+    counts = np.asarray(histogram, dtype=np.float64)
+    if counts.max() <= 0:
+        return ""
+    levels = np.ceil(counts / counts.max() * (len(SPARK) - 1)).astype(int)
+    return "".join(SPARK[level] for level in levels)
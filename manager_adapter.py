@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import tempfile
+
+import bpy
+
+from .algorithm.algorithm import Algorithm, score_rifles
+from .algorithm.cache import ResultCache, result_key
+from .algorithm.data import Rifle, SceneData
+from .algorithm.leaderboard import Leaderboard
+from .algorithm.uncertainty import UncertaintySettings, monte_carlo
+from .history.history import HISTORY
+from .maintenance.log import LOG
+from .registry.registry import REGISTRY
+
+HISTORY_FLUSH_INTERVAL = 2.0  # Seconds between batched history writes
+HISTORY_SUFFIX = ".calcrack.sqlite"
+
+
+def scene_data(scene):
+    '''Blender scene -> SceneData. The mic arrays are the registry's own, so no copy is made.'''
+    mics = REGISTRY.ensure(scene)
+    settings = scene.calcrack
+    return SceneData(
+        temp_f=settings.temp_f,
+        error_margin=settings.error_margin,
+        print_to_terminal=settings.print_to_terminal,
+        air_drag=settings.air_drag,
+        scoring=settings.scoring,
+        robust_scale=settings.robust_scale,
+        mic_names=mics.mic_names,
+        mic_positions=mics.mic_positions,
+        actual_delta_ts=mics.actual_delta_ts,
+        mic_confidences=mics.mic_confidences
+    )
+
+
+def rifle_data(obj):
+    '''Blender rifle object -> Rifle.'''
+    return Rifle(
+        name=obj.name,
+        origin=tuple(obj.matrix_world.translation),
+        endpoint=tuple(obj.aim_target.matrix_world.translation),
+        ammo_speed=obj.ammo_speed,
+        duration_flight=obj.duration_flight,
+        drag_model=obj.drag_model,
+        ballistic_coeff=obj.ballistic_coeff
+    )
+
+
+def fire(scene, obj):
+    '''Runs the Algorithm for one Blender rifle.'''
+    settings = scene.calcrack
+    if settings.print_to_terminal:
+        LOG.configure(settings.print_terminal, bpy.path.abspath(settings.print_log_file), settings.print_lines_per_second)
+
+    Result = Algorithm(scene_data(scene), rifle_data(obj)).execute()
+    record(scene, Result.rifle, Result.aggregated_errors, Result.mean_error, Result.errors)
+    LEADERBOARD.update([obj.name], [Result.aggregated_errors], [Result.mean_error], Result.errors, Result.mic_names)
+    return Result
+
+
+RESULT_CACHE = ResultCache()
+LEADERBOARD = Leaderboard()
+
+
+def fire_cached(scene, obj):
+    '''
+    (aggregated_errors, mean_error) for one Blender rifle, answered from RESULT_CACHE when the same inputs were seen
+    before. Print Mode always runs the Algorithm so its per-mic output still appears.
+    '''
+    if scene.calcrack.print_to_terminal:
+        Result = fire(scene, obj)
+        return Result.aggregated_errors, Result.mean_error
+
+    data = scene_data(scene)
+    rifle = rifle_data(obj)
+    key = result_key(data, rifle, REGISTRY.mic_set_hash())
+
+    result = RESULT_CACHE.get(key)
+    if result is None:
+        Result = Algorithm(data, rifle).execute()
+        result = (Result.aggregated_errors, Result.mean_error, Result.errors)
+        RESULT_CACHE.put(key, result)
+        record(scene, rifle, *result)  # A cache hit was recorded when it was first scored
+
+    aggregated_errors, mean_error, errors = result
+    LEADERBOARD.update([obj.name], [aggregated_errors], [mean_error], errors, data.mic_names)
+    return aggregated_errors, mean_error
+
+
+def fire_many(scene, objs):
+    '''
+    fire_cached for many Blender rifles at once. The mic data is gathered once, and every rifle missing from
+    RESULT_CACHE is scored in a single score_rifles pass. Returns (aggregated_errors, mean_error) per rifle.
+    '''
+    if scene.calcrack.print_to_terminal or len(objs) < 2:
+        return [fire_cached(scene, obj) for obj in objs]
+
+    data = scene_data(scene)
+    mic_hash = REGISTRY.mic_set_hash()
+    rifles = [rifle_data(obj) for obj in objs]
+    keys = [result_key(data, rifle, mic_hash) for rifle in rifles]
+    results = [RESULT_CACHE.get(key) for key in keys]
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        errors, aggregated, mean = score_rifles(data, [rifles[i] for i in missing])
+        for row, i in enumerate(missing):
+            results[i] = (float(aggregated[row]), float(mean[row]), errors[row].copy())  # A view would keep the whole batch alive in the cache
+            RESULT_CACHE.put(keys[i], results[i])
+            record(scene, rifles[i], *results[i])
+
+    LEADERBOARD.update(
+        [obj.name for obj in objs],
+        [result[0] for result in results],
+        [result[1] for result in results],
+        [result[2] for result in results],
+        data.mic_names
+    )
+    return [(aggregated_errors, mean_error) for aggregated_errors, mean_error, _ in results]
+
+
+def record(scene, rifle, aggregated_errors, mean_error, errors):
+    '''Queues one evaluated candidate for the history store. A timer writes the queue in one transaction.'''
+    settings = scene.calcrack
+    if not settings.record_history:
+        return
+
+    HISTORY.open(history_path())
+    HISTORY.add(
+        rifle.name, rifle.origin, rifle.endpoint, rifle.ammo_speed, settings.temp_f, settings.error_margin,
+        aggregated_errors, mean_error, REGISTRY.mic_set_hash(), errors, settings.scoring, settings.robust_scale
+    )
+    if not bpy.app.timers.is_registered(flush_history):
+        bpy.app.timers.register(flush_history, first_interval=HISTORY_FLUSH_INTERVAL)
+
+
+def flush_history():
+    HISTORY.flush()
+    return None
+
+
+def history_path():
+    '''Next to the .blend file, or in the temp folder until it is saved.'''
+    if bpy.data.filepath:
+        return os.path.splitext(bpy.data.filepath)[0] + HISTORY_SUFFIX
+    return os.path.join(bpy.app.tempdir or tempfile.gettempdir(), "calcrack" + HISTORY_SUFFIX)
+
+
+def uncertainty(scene, objs):
+    '''Monte Carlo error bands for Blender rifles, all scored against the same draws.'''
+    settings = scene.calcrack
+    return monte_carlo(scene_data(scene), [rifle_data(obj) for obj in objs], UncertaintySettings(
+        draws=settings.uncertainty_draws,
+        temp_sigma_f=settings.uncertainty_temp_f,
+        mic_position_sigma=settings.uncertainty_position,
+        speed_sigma=settings.uncertainty_speed / 100.0,
+        delta_t_scale=settings.uncertainty_delta_t
+    ))
@@ -4,42 +4,205 @@
 # pyright: reportInvalidTypeForm=false
 
 import bpy
+import math
+import time
+from contextlib import contextmanager
 from bpy.app.handlers import persistent
 
-from .algorithm.algorithm import Algorithm
+from .manager_adapter import LEADERBOARD, RESULT_CACHE, fire_many, flush_history
+from .history.history import HISTORY
+from .maintenance.log import LOG
+from .maintenance.profiler import PROFILER, timed
+from .registry.registry import REGISTRY
 
 _IS_RUNNING = False
+_LAST_INPUTS = None  # Scene-wide settings seen by the last evaluation
+_PENDING = set()  # Pointers of rifles waiting for the scheduler
+_LAST_FIRED = 0.0
+_BATCH_DEPTH = 0  # Nesting level of batch_mode. The handler is muted while above 0
+_BATCH_FIRED = set()  # Pointers of rifles an operator already evaluated inside the batch
+_BATCH_AFFECTED = set()  # Pointers of rifles the batch's own updates touched, collected while muted
 
 
 def fire_all_rifles(scene):
-    if not bpy.context.scene.calcrack.live_update:
+    if not scene.calcrack.live_update:
         return
-    
-    all_rifles = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH' and obj.aim_target]
-    for rifle in all_rifles:
-        Result = Algorithm(scene, rifle).execute()
-        rifle.aggregated_errors = Result.aggregated_errors
-        rifle.mean_error = Result.mean_error
+
+    fire_rifles(scene, REGISTRY.ensure(scene).rifles)
+
+
+@timed("events.fire_rifles")
+def fire_rifles(scene, rifles):
+    for rifle, (aggregated_errors, mean_error) in zip(rifles, fire_many(scene, rifles)):
+        set_if_changed(rifle, 'aggregated_errors', aggregated_errors)
+        set_if_changed(rifle, 'mean_error', mean_error)
+
+
+def find_affected_rifles(scene, depsgraph):
+    '''Rifles whose result can change because of this depsgraph update.'''
+    global _LAST_INPUTS
+
+    rifles = REGISTRY.apply_updates(scene, depsgraph)
+
+    inputs = scene_inputs(scene)
+    if inputs != _LAST_INPUTS:
+        _LAST_INPUTS = inputs
+        return REGISTRY.rifles
+    return rifles
+
+
+def scene_inputs(scene):
+    '''Everything outside the mics and rifles that changes results.'''
+    settings = scene.calcrack
+    return (settings.live_update, settings.temp_f, settings.error_margin, settings.air_drag, settings.scoring, settings.robust_scale)
+
+
+def set_if_changed(obj, prop, value):
+    '''Writing a property tags a depsgraph update, so identical writes would re-trigger the handler forever.
+    FloatProperty stores single precision, hence the tolerance.'''
+    if not math.isclose(getattr(obj, prop), value, rel_tol=1e-6, abs_tol=1e-9):
+        setattr(obj, prop, value)
+
+
+@contextmanager
+def batch_mode(context):
+    '''
+    Wrap every Calcrack operator in this. Creating objects, setting frames and moving rifles each tag depsgraph
+    updates, and the live-update handler would evaluate the rifles for every one of them.
+
+    The handler is muted for the duration. On leaving the outermost batch, the pending updates are flushed while
+    still muted, which only collects the rifles they touch, and those are evaluated exactly once, except the ones
+    passed to mark_fired.
+    '''
+    global _BATCH_DEPTH
+    _BATCH_DEPTH += 1
+    completed = False
+    try:
+        yield
+        completed = True
+    finally:
+        if _BATCH_DEPTH == 1:
+            end_batch(context, completed)
+        _BATCH_DEPTH -= 1
+
+
+def mark_fired(rifle):
+    '''Tells the current batch this rifle's results are already up to date.'''
+    _BATCH_FIRED.add(rifle.as_pointer())
+
+
+def end_batch(context, evaluate):
+    scene = context.scene
+    context.view_layer.update()  # Runs the handler for the batch's own updates now, while it is still muted
+    affected = _BATCH_AFFECTED - _BATCH_FIRED
+    _BATCH_AFFECTED.clear()
+    _BATCH_FIRED.clear()
+    if not evaluate or not scene.calcrack.live_update or not affected:
+        return
+
+    _PENDING.difference_update(affected)
+    fire_rifles(scene, [rifle for rifle in REGISTRY.ensure(scene).rifles if rifle.as_pointer() in affected])
+    context.view_layer.update()  # Same for the results we just wrote
+    _BATCH_AFFECTED.clear()
 
 
 @persistent
+@timed("events.depsgraph_update_handler")
 def depsgraph_update_handler(scene, depsgraph):
     global _IS_RUNNING
     if _IS_RUNNING:
         return
+    if _BATCH_DEPTH:
+        _BATCH_AFFECTED.update(rifle.as_pointer() for rifle in find_affected_rifles(scene, depsgraph))
+        return
 
     _IS_RUNNING = True
     try:
-        fire_all_rifles(scene)
+        rifles = find_affected_rifles(scene, depsgraph)  # Keeps the registry current even with live update off
+        if not scene.calcrack.live_update or not rifles:
+            return
+        if scene.calcrack.live_update_interval <= 0.0:
+            fire_rifles(scene, rifles)
+            return
+        schedule_rifles(rifles)
     finally:
         _IS_RUNNING = False
 
 
+def schedule_rifles(rifles):
+    '''Coalesces bursts of updates. The timer fires at most once per interval and always once after the last update.'''
+    _PENDING.update(rifle.as_pointer() for rifle in rifles)
+    if not bpy.app.timers.is_registered(fire_pending_rifles):
+        bpy.app.timers.register(fire_pending_rifles, first_interval=0.0)
+
+
+@timed("events.fire_pending_rifles")
+def fire_pending_rifles():
+    global _IS_RUNNING, _LAST_FIRED
+    if not _PENDING:
+        return None
+
+    scene = bpy.context.scene
+    interval = scene.calcrack.live_update_interval
+    wait = _LAST_FIRED + interval - time.monotonic()
+    if wait > 0.0:
+        return wait
+
+    rifles = [rifle for rifle in REGISTRY.ensure(scene).rifles if rifle.as_pointer() in _PENDING]
+    _PENDING.clear()
+
+    _IS_RUNNING = True
+    try:
+        fire_rifles(scene, rifles)
+    finally:
+        _IS_RUNNING = False
+        _LAST_FIRED = time.monotonic()
+
+    return interval if _PENDING else None
+
+
+@persistent
+def invalidate_registry_handler(*args):
+    REGISTRY.invalidate()
+    _PENDING.clear()
+    PROFILER.enabled = bpy.context.scene.calcrack.profiling
+
+
+@persistent
+def close_history_handler(*args):
+    HISTORY.close()  # Writes the rows still queued for the file being closed
+
+
 def register():
-    if depsgraph_update_handler not in bpy.app.handlers.depsgraph_update_pre:
-        bpy.app.handlers.depsgraph_update_pre.append(depsgraph_update_handler)
+    if depsgraph_update_handler not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(depsgraph_update_handler)
+
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if invalidate_registry_handler not in handlers:
+            handlers.append(invalidate_registry_handler)
+
+    if close_history_handler not in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.append(close_history_handler)
 
 
 def unregister():
-    if depsgraph_update_handler in bpy.app.handlers.depsgraph_update_pre:
-        bpy.app.handlers.depsgraph_update_pre.remove(depsgraph_update_handler)
\ No newline at end of file
+    if depsgraph_update_handler in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update_handler)
+
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if invalidate_registry_handler in handlers:
+            handlers.remove(invalidate_registry_handler)
+
+    if close_history_handler in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(close_history_handler)
+    if bpy.app.timers.is_registered(flush_history):
+        bpy.app.timers.unregister(flush_history)
+    HISTORY.close()
+    LOG.close()
+
+    if bpy.app.timers.is_registered(fire_pending_rifles):
+        bpy.app.timers.unregister(fire_pending_rifles)
+    REGISTRY.invalidate()
+    RESULT_CACHE.clear()
+    LEADERBOARD.clear()
+    _PENDING.clear()
@@ -5,11 +5,28 @@
 
 import bpy
 from bpy.types import Operator
+from bpy.props import IntProperty, StringProperty, EnumProperty
 from bpy.utils import register_class, unregister_class
 
-from .algorithm.algorithm import Algorithm
+from .manager_adapter import LEADERBOARD, fire, fire_cached, history_path, rifle_data, scene_data, uncertainty
+from .manager_events import batch_mode, fire_rifles, mark_fired
 from .simulate_advanced.simulate_advanced import SimulateAdvanced
 from .simulate.simulate import Simulate
+from .simulate.pool import clear_simulation
+from .solve.solve import Solve
+from .solve.posterior import PosteriorMap
+from .solve.refine import Refine
+from .registry.registry import REGISTRY
+from .algorithm.onsets import detect_folder
+from .algorithm.algorithm import score_rifles
+from .algorithm.data import Rifle
+from .algorithm.robust import consensus
+from .history.history import HISTORY
+from .maintenance.profiler import PROFILER
+
+DEFAULT_TARGET_DISTANCE = 100.0
+SWEEP_POLL_INTERVAL = 0.1
+SIMULATION_START_TIME = .001  # Simulations start at frame 1, and Set Crack/Thump record frame * .001
     
 
 class CALCRACK_OT_rifle_fire(Operator):
@@ -19,10 +36,97 @@ class CALCRACK_OT_rifle_fire(Operator):
 
     def execute(self, context):
         ao = context.active_object
-        Result = Algorithm(context.scene, ao).execute()
-        ao.aggregated_errors = Result.aggregated_errors
-        ao.mean_error = Result.mean_error
-        self.report({'INFO'}, f"Aggregated Error: {round(Result.aggregated_errors, 3)}s. Mean Error: {round(Result.mean_error, 3)}s.")
+        with batch_mode(context):
+            aggregated_errors, mean_error = fire_cached(context.scene, ao)
+            ao.aggregated_errors = aggregated_errors
+            ao.mean_error = mean_error
+            mark_fired(ao)
+        self.report({'INFO'}, f"Aggregated Error: {round(aggregated_errors, 3)}s. Mean Error: {round(mean_error, 3)}s.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_rifle_refine(Operator):
+    '''Nudge the current rifle and its target to the nearby position and angle that best fits every microphone'''
+    bl_idname = 'calcrack.rifle_refine'
+    bl_label = "Refine"
+
+    def execute(self, context):
+        ao = context.active_object
+        with batch_mode(context):
+            Seed = fire(context.scene, ao)
+            Refined = Refine(context.scene, ao, Seed, fit_speed=context.scene.calcrack.refine_speed).execute()
+
+            context.view_layer.update()
+            Result = fire(context.scene, ao)
+            ao.aggregated_errors = Result.aggregated_errors
+            ao.mean_error = Result.mean_error
+            mark_fired(ao)
+        self.report({'INFO'}, f"Refined in {Refined.iterations} steps. Mean Error: {round(Seed.mean_error, 3)}s -> {round(Result.mean_error, 3)}s.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_rifles_uncertainty(Operator):
+    '''Score every rifle against thousands of scenarios with jittered temperature, Delta T, microphone positions and speed'''
+    bl_idname = 'calcrack.rifles_uncertainty'
+    bl_label = "Uncertainty"
+
+    def execute(self, context):
+        rifles = REGISTRY.ensure(context.scene).rifles
+        if not rifles or not len(REGISTRY.mics):
+            self.report({'ERROR'}, "Needs at least one rifle with a target and one microphone with a Delta T.")
+            return {'CANCELLED'}
+
+        Result = uncertainty(context.scene, rifles)
+        with batch_mode(context):
+            for rifle, (low, median, high), best in zip(rifles, Result.mean_bands, Result.best_fraction):
+                rifle.uncertainty_low = low
+                rifle.uncertainty_median = median
+                rifle.uncertainty_high = high
+                rifle.uncertainty_best = best
+
+        draws = Result.mean_errors.shape[1]
+        self.report({'INFO'}, f"Scored {len(rifles)} rifles against {draws} draws.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_rifles_rank(Operator):
+    '''Score every rifle against the microphones in one batch and rank them in the Leaderboard'''
+    bl_idname = 'calcrack.rifles_rank'
+    bl_label = "Rank All"
+
+    def execute(self, context):
+        rifles = REGISTRY.ensure(context.scene).rifles
+        if not rifles or not len(REGISTRY.mics):
+            self.report({'ERROR'}, "Needs at least one rifle with a target and one microphone with a Delta T.")
+            return {'CANCELLED'}
+
+        with batch_mode(context):
+            fire_rifles(context.scene, rifles)
+            for rifle in rifles:
+                mark_fired(rifle)
+
+        best = LEADERBOARD.standings([rifle.name for rifle in rifles])[0]
+        self.report({'INFO'}, f"Ranked {len(rifles)} rifles. Best: {best.rifle}, Mean Error: {round(best.mean_error, 3)}s.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_rifle_select(Operator):
+    '''Select this rifle and make it the active object'''
+    bl_idname = 'calcrack.rifle_select'
+    bl_label = "Select Rifle"
+
+    name: StringProperty()
+
+    def execute(self, context):
+        obj = context.scene.objects.get(self.name)
+        if obj is None:
+            self.report({'ERROR'}, f"{self.name} no longer exists.")
+            return {'CANCELLED'}
+
+        for selected in context.selected_objects:
+            selected.select_set(False)
+        obj.select_set(True)
+        context.view_layer.objects.active = obj
         return {'FINISHED'}
     
 
@@ -33,16 +137,251 @@ class CALCRACK_OT_rifle_simulate(Operator):
 
     def execute(self, context):
         ao = context.active_object
-        Result = Algorithm(context.scene, ao).execute()
+        with batch_mode(context):
+            Result = fire(context.scene, ao)
 
-        if context.scene.calcrack.air_drag:
-            SimulateAdvanced(context.scene, ao, Result).execute()
-        else:
-            Simulate(context.scene, ao, Result).execute()
+            if context.scene.calcrack.air_drag:
+                SimulateAdvanced(context.scene, ao, Result).execute()
+            else:
+                Simulate(context.scene, ao, Result).execute()
         self.report({'INFO'}, f"Mach cone and bang simulations added. Press play to begin setting C/T points on each microphone.")
         return {'FINISHED'}
     
 
+class CALCRACK_OT_rifle_simulation_clear(Operator):
+    '''Delete the current rifle's mach cone and bang simulation'''
+    bl_idname = 'calcrack.rifle_simulation_clear'
+    bl_label = "Clear Simulation"
+
+    def execute(self, context):
+        with batch_mode(context):
+            removed = clear_simulation(context.active_object)
+        self.report({'INFO'}, f"Removed {removed} simulation objects.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_rifle_arrivals_set(Operator):
+    '''Set every microphone's crack and thump times to when this rifle's simulation reaches it, without scrubbing the timeline'''
+    bl_idname = 'calcrack.rifle_arrivals_set'
+    bl_label = "Set All C/T"
+
+    def execute(self, context):
+        ao = context.active_object
+        mics = REGISTRY.ensure(context.scene).mics
+        if not mics:
+            self.report({'ERROR'}, "No microphones with a Delta T.")
+            return {'CANCELLED'}
+
+        with batch_mode(context):
+            Result = fire(context.scene, ao)
+            t_crack, t_thump, reached = Result.predict_arrival_times()
+
+            for mic, crack, thump, heard in zip(mics, t_crack, t_thump, reached):
+                mic.time_thump = SIMULATION_START_TIME + thump
+                mic.time_crack = SIMULATION_START_TIME + (crack if heard else thump)  # No crack reaches it, same as a 0 delta-t prediction
+            calculate_scene_simulation_errors(context)
+        self.report({'INFO'}, f"Set crack and thump times on {len(mics)} microphones, {int(reached.sum())} inside the mach cone.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_rifle_solve(Operator):
+    '''Sweep every rifle position, aim direction and bullet speed in the search volume and rank the best candidates'''
+    bl_idname = 'calcrack.rifle_solve'
+    bl_label = "Solve"
+
+    def execute(self, context):
+        if not self.prepare(context):
+            return {'CANCELLED'}
+        with batch_mode(context):
+            self.Solved.execute(workers=context.scene.calcrack.solve_workers)
+        return self.report_best(context)
+
+    def invoke(self, context, event):
+        workers = context.scene.calcrack.solve_workers
+        if workers == 1:
+            return self.execute(context)
+
+        if not self.prepare(context):
+            return {'CANCELLED'}
+        self.Solved.prepare()
+        self.Solved.start_sweep(workers)
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(SWEEP_POLL_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.Solved.Sweep.cancel()
+            self.end_modal(context)
+            self.report({'WARNING'}, "Solve cancelled.")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        if not self.Solved.Sweep.done():
+            context.workspace.status_text_set(f"Calcrack solving... {round(self.Solved.Sweep.progress() * 100)}%. Press Esc to cancel.")
+            return {'PASS_THROUGH'}
+
+        self.end_modal(context)
+        with batch_mode(context):
+            self.Solved.collect_sweep()
+            self.Solved.finish()
+        return self.report_best(context)
+
+    def prepare(self, context):
+        ao = context.active_object
+        error = rifle_error(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return False
+        if context.scene.calcrack.solve_volume is None:
+            self.report({'ERROR'}, "Pick a Search Volume object first.")
+            return False
+
+        Result = fire(context.scene, ao)
+        self.Solved = Solve(context.scene, ao, Result)
+        return True
+
+    def end_modal(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+
+    def report_best(self, context):
+        best = context.scene.calcrack.solutions[0] if len(context.scene.calcrack.solutions) else None
+        if best is None:
+            self.report({'WARNING'}, "Search volume produced no candidates.")
+            return {'FINISHED'}
+        self.report({'INFO'}, f"Tested {self.Solved.evaluations} candidates. Best Mean Error: {round(best.mean_error, 3)}s.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_rifle_posterior(Operator):
+    '''Map how likely the shot came from each cell of the search volume, over every aim and speed, and draw its credible region'''
+    bl_idname = 'calcrack.rifle_posterior'
+    bl_label = "Posterior Map"
+
+    def execute(self, context):
+        error = rifle_error(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+        if context.scene.calcrack.solve_volume is None:
+            self.report({'ERROR'}, "Pick a Search Volume object first.")
+            return {'CANCELLED'}
+
+        with batch_mode(context):
+            Result = fire(context.scene, context.active_object)
+            Mapped = PosteriorMap(context.scene, context.active_object, Result).execute()
+
+        Posterior = Mapped.Posterior
+        self.report({'INFO'}, (
+            f"{round(Posterior.credible_mass * 100)}% credible region: {int(Posterior.credible.sum())} cells, "
+            f"{round(Mapped.region_area())} m². Most likely cell: {round(float(Posterior.probability.max()) * 100, 1)}%."
+        ))
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_solution_apply(Operator):
+    '''Move the current rifle and its target to this solver candidate'''
+    bl_idname = 'calcrack.solution_apply'
+    bl_label = "Apply Candidate"
+
+    index: IntProperty()
+    collection: StringProperty(default='solutions')
+
+    def execute(self, context):
+        error = rifle_error(context, needs_mics=False)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+
+        ao = context.active_object
+        solution = getattr(context.scene.calcrack, self.collection)[self.index]
+        origin = solution.origin.copy()
+
+        target = ao.aim_target
+        distance = (target.matrix_world.translation - ao.matrix_world.translation).length
+        if distance == 0.0:
+            distance = DEFAULT_TARGET_DISTANCE
+
+        with batch_mode(context):
+            ao.matrix_world.translation = origin
+            target.matrix_world.translation = origin + solution.direction.normalized() * distance
+            ao.ammo_speed = solution.ammo_speed
+        self.report({'INFO'}, f"Applied candidate {self.index + 1}. Mean Error: {round(solution.mean_error, 3)}s.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_history_query(Operator):
+    '''List previously evaluated candidates from the history file'''
+    bl_idname = 'calcrack.history_query'
+    bl_label = "Query History"
+
+    kind: EnumProperty(items=[
+        ('BEST', "Best", "Smallest mean error against the current microphones"),
+        ('NEARBY', "Nearby", "Best candidates within Radius of the selected rifle"),
+        ('RIFLE', "This Rifle", "Most recent candidates evaluated for the selected rifle"),
+    ])
+
+    def execute(self, context):
+        settings = context.scene.calcrack
+        ao = context.active_object
+        mic_hash = REGISTRY.ensure(context.scene).mic_set_hash()
+        HISTORY.open(history_path())
+
+        if self.kind == 'BEST':
+            entries = HISTORY.best(mic_hash, settings.scoring, settings.robust_scale, settings.history_limit)
+        elif self.kind == 'NEARBY':
+            entries = HISTORY.nearby(
+                mic_hash, settings.scoring, settings.robust_scale, ao.matrix_world.translation, settings.history_radius, settings.history_limit
+            )
+        else:
+            entries = HISTORY.rifle_history(ao.name, settings.history_limit)
+
+        results = settings.history_results
+        results.clear()
+        for entry in entries:
+            result = results.add()
+            result.origin = entry.origin
+            result.direction = [e - o for e, o in zip(entry.endpoint, entry.origin)]
+            result.ammo_speed = int(round(entry.ammo_speed))
+            result.aggregated_errors = entry.aggregated_errors
+            result.mean_error = entry.mean_error
+
+        self.report({'INFO'}, f"Found {len(entries)} of {HISTORY.count()} recorded candidates.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_profile_export(Operator):
+    '''Save the Performance panel's timings to a JSON file for comparing runs'''
+    bl_idname = 'calcrack.profile_export'
+    bl_label = "Export Timings"
+
+    filepath: StringProperty(subtype='FILE_PATH', default="calcrack_timings.json")
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        PROFILER.export_json(bpy.path.abspath(self.filepath))
+        self.report({'INFO'}, f"Saved {len(PROFILER.spans)} timed steps to {self.filepath}.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_profile_clear(Operator):
+    '''Forget every timing collected so far'''
+    bl_idname = 'calcrack.profile_clear'
+    bl_label = "Clear Timings"
+
+    def execute(self, context):
+        PROFILER.clear()
+        return {'FINISHED'}
+    
+
 class CALCRACK_OT_crack_set(Operator):
     '''Press when the simulated mach cone intersects this microphone's diaphragm'''
     bl_idname = 'calcrack.crack_set'
@@ -50,8 +389,9 @@ class CALCRACK_OT_crack_set(Operator):
 
     def execute(self, context):
         ao = context.active_object
-        ao.time_crack = context.scene.frame_current * .001
-        calculate_scene_simulation_errors(context)
+        with batch_mode(context):
+            ao.time_crack = context.scene.frame_current * .001
+            calculate_scene_simulation_errors(context)
         self.report({'INFO'}, f"Set microphone's crack time to {context.scene.frame_current}")
         return {'FINISHED'}
     
@@ -63,17 +403,97 @@ class CALCRACK_OT_thump_set(Operator):
 
     def execute(self, context):
         ao = context.active_object
-        ao.time_thump = context.scene.frame_current * .001
-        calculate_scene_simulation_errors(context)
+        with batch_mode(context):
+            ao.time_thump = context.scene.frame_current * .001
+            calculate_scene_simulation_errors(context)
         self.report({'INFO'}, f"Set microphone's thump time to {context.scene.frame_current}")
         return {'FINISHED'}
     
 
+class CALCRACK_OT_mics_import_wav(Operator):
+    '''Detect the crack and thump in every recording of a folder and set Delta T and Confidence on the microphone with the same name'''
+    bl_idname = 'calcrack.mics_import_wav'
+    bl_label = "Import Recordings"
+
+    directory: StringProperty(subtype='DIR_PATH')
+    workers: IntProperty(name="Workers", default=0, min=0, description="Recordings read in parallel. 0 uses every core")
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        detections = detect_folder(bpy.path.abspath(self.directory), self.workers)
+        mics = {obj.name.lower(): obj for obj in context.scene.objects if obj.type == 'CAMERA'}
+
+        updated, unmatched, failed = 0, [], []
+        with batch_mode(context):
+            for detection in detections:
+                mic = mics.get(detection.name.lower())
+                if mic is None:
+                    unmatched.append(detection.name)
+                elif detection.error:
+                    failed.append(f"{detection.name} ({detection.error})")
+                else:
+                    mic.delta_t = round(detection.delta_t, 3)
+                    mic.confidence = detection.confidence
+                    updated += 1
+
+        for name in failed:
+            self.report({'WARNING'}, f"No crack and thump found in {name}.")
+        if unmatched:
+            self.report({'WARNING'}, f"No microphone named {', '.join(unmatched)}.")
+        self.report({'INFO'}, f"Set Delta T on {updated} of {len(detections)} microphones.")
+        return {'FINISHED'}
+    
+
+class CALCRACK_OT_mics_consensus(Operator):
+    '''Find the rifle or solver candidate most microphones agree on, and flag the microphones that disagree with it'''
+    bl_idname = 'calcrack.mics_consensus'
+    bl_label = "Find Outliers"
+
+    def execute(self, context):
+        scene = context.scene
+        registry = REGISTRY.ensure(scene)
+        candidates = [rifle_data(rifle) for rifle in registry.rifles] + [
+            Rifle(f"Candidate {index + 1}", tuple(solution.origin), tuple(solution.origin + solution.direction), solution.ammo_speed)
+            for index, solution in enumerate(scene.calcrack.solutions)
+        ]
+        if not candidates or not len(registry.mics):
+            self.report({'ERROR'}, "Needs at least one rifle or solver candidate and one microphone with a Delta T.")
+            return {'CANCELLED'}
+
+        errors, _, _ = score_rifles(scene_data(scene), candidates)
+        Consensus = consensus(errors, scene.calcrack.robust_scale)
+
+        with batch_mode(context):
+            for obj in scene.objects:
+                if obj.type == 'CAMERA' and obj.is_outlier:
+                    obj.is_outlier = False
+            for mic, inlier in zip(registry.mics, Consensus.inliers):
+                mic.is_outlier = not inlier
+
+        outliers = [mic.name for mic, inlier in zip(registry.mics, Consensus.inliers) if not inlier]
+        best = candidates[Consensus.candidate].name
+        if outliers:
+            self.report({'WARNING'}, f"{len(outliers)} microphones disagree with {best}: {', '.join(outliers)}.")
+        else:
+            self.report({'INFO'}, f"Every microphone agrees with {best}.")
+        return {'FINISHED'}
+    
+
+def rifle_error(context, needs_mics=True):
+    '''Why the active object can't be fired, or None when it can.'''
+    ao = context.active_object
+    if ao is None or ao.type != 'MESH' or not ao.aim_target:
+        return "Select a rifle with a Target first."
+    if needs_mics and not len(REGISTRY.ensure(context.scene).mics):
+        return "Needs at least one microphone with a Delta T."
+    return None
+
+
 def calculate_scene_simulation_errors(context):
-    all_mics = [
-        obj for obj in context.scene.objects
-        if obj.type == 'CAMERA' and obj.delta_t != 0.0
-    ]
+    all_mics = REGISTRY.ensure(context.scene).mics
 
     aggregated_errors = []
     for mic in all_mics:
@@ -91,9 +511,23 @@ def calculate_scene_simulation_errors(context):
     
 classes = [
     CALCRACK_OT_rifle_fire,
+    CALCRACK_OT_rifle_refine,
+    CALCRACK_OT_rifles_uncertainty,
+    CALCRACK_OT_rifles_rank,
+    CALCRACK_OT_rifle_select,
     CALCRACK_OT_rifle_simulate,
+    CALCRACK_OT_rifle_simulation_clear,
+    CALCRACK_OT_rifle_arrivals_set,
+    CALCRACK_OT_rifle_solve,
+    CALCRACK_OT_rifle_posterior,
+    CALCRACK_OT_solution_apply,
+    CALCRACK_OT_history_query,
+    CALCRACK_OT_profile_export,
+    CALCRACK_OT_profile_clear,
     CALCRACK_OT_crack_set,
-    CALCRACK_OT_thump_set
+    CALCRACK_OT_thump_set,
+    CALCRACK_OT_mics_import_wav,
+    CALCRACK_OT_mics_consensus
 ]
 
 
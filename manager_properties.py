@@ -5,12 +5,26 @@
 
 import bpy
 from bpy.types import PropertyGroup
-from bpy.props import IntProperty, PointerProperty, FloatProperty, BoolProperty
+from bpy.props import IntProperty, PointerProperty, FloatProperty, BoolProperty, FloatVectorProperty, CollectionProperty, EnumProperty, StringProperty
 from bpy.utils import register_class, unregister_class
 
+from .maintenance.profiler import PROFILER
+
 SPEED_SOUND_IN_FPS = 1126
 
 
+def update_profiling(self, context):
+    PROFILER.enabled = self.profiling
+
+
+class CALCRACK_PG_solution(PropertyGroup):
+    origin: FloatVectorProperty(name="Origin", subtype='XYZ')
+    direction: FloatVectorProperty(name="Direction", subtype='DIRECTION')
+    ammo_speed: IntProperty(name="Projectile Speed", description="Velocity of bullet, in Feet per Second (FPS)")
+    aggregated_errors: FloatProperty(name="Aggregated Error")
+    mean_error: FloatProperty(name="Mean Error")
+
+
 class CALCRACK_PG_scene(PropertyGroup):
     temp_f: IntProperty(name="Temperature (F)", default=72)
     error_margin: FloatProperty(
@@ -21,19 +35,92 @@ class CALCRACK_PG_scene(PropertyGroup):
     print_to_terminal: BoolProperty(
         name="Print Results", 
         default=False,
-        description="Run Blender from CMD (Windows) or Terminal (Mac) to see additional data printouts. WARNING: May cause lag!"
+        description="Record every mic's actual and predicted delta-t for each evaluation. Run Blender from CMD (Windows) or Terminal (Mac) to see them. Records are written in the background, so live update stays fast"
+    )
+    print_terminal: BoolProperty(
+        name="To Terminal",
+        default=True,
+        description="Print the records in the terminal, at most Lines per Second"
+    )
+    print_lines_per_second: IntProperty(
+        name="Lines per Second",
+        default=200,
+        min=1,
+        max=100000,
+        description="Terminal lines printed per second at most. The rest are counted and skipped, but still written to the Log File"
+    )
+    print_log_file: StringProperty(
+        name="Log File",
+        default="",
+        subtype='FILE_PATH',
+        description="Also append every record to this JSON Lines file, one line per mic. Leave empty to skip"
     )
     air_drag: BoolProperty(
         name="Consider Air Drag", 
         default=False,
-        description="Use a more accurate and resource-intensive simulation that factors in air drag"
+        description="Slow the bullet down with its drag model and ballistic coefficient, in both the math and the simulation"
+    )
+    refine_speed: BoolProperty(
+        name="Refine Speed",
+        default=False,
+        description="Let Refine adjust the rifle's projectile speed along with its position and angle"
+    )
+    scoring: EnumProperty(
+        name="Scoring",
+        items=[
+            ('ABSOLUTE', "Absolute", "Add up every microphone's error. One mis-picked microphone can outweigh all the others"),
+            ('HUBER', "Huber", "Errors above the Outlier Scale count linearly and small ones count less, so near-misses matter less than big misses"),
+            ('TUKEY', "Tukey", "Errors above the Outlier Scale all count the same, so a mis-picked microphone can't decide the ranking"),
+        ],
+        default='ABSOLUTE'
+    )
+    robust_scale: FloatProperty(name="Outlier Scale (s)", default=.010, min=.001, max=1.0, description="Error beyond which a microphone is treated as a possible mis-pick by Huber/Tukey scoring and by Find Outliers")
+    profiling: BoolProperty(
+        name="Profiling",
+        default=False,
+        update=update_profiling,
+        description="Time each calculation, simulation and live-update step for the Performance panel. Adds a little overhead"
     )
     live_update: BoolProperty(name="Live Update", default=True, description="Automatically fire rifles when scene changes (Calculate Mathematically method)")
+    live_update_interval: FloatProperty(
+        name="Update Interval (s)",
+        default=.05,
+        min=0.0,
+        max=2.0,
+        description="Live Update fires each rifle at most once per interval while dragging, plus once when the drag settles. 0 fires on every scene change"
+    )
     aggregated_errors: FloatProperty(name="Aggregated Error (Sim)", description="Total aggregated error from microphone C/T set points from simulation")
     mean_error: FloatProperty(name="Mean Error (Sim)", description="Mean error from microphone C/T set points from simulation")
 
+    solve_volume: PointerProperty(name="Search Volume", type=bpy.types.Object, description="Object whose bounding box contains every rifle position to test")
+    solve_cell_size: FloatProperty(name="Cell Size (m)", default=5.0, min=.1, description="Spacing between tested rifle positions")
+    solve_azimuth_steps: IntProperty(name="Azimuth Steps", default=72, min=1, description="Number of aim headings tested around the full circle")
+    solve_elevation_min: FloatProperty(name="Elevation Min", default=-0.1745329, subtype='ANGLE')
+    solve_elevation_max: FloatProperty(name="Elevation Max", default=0.1745329, subtype='ANGLE')
+    solve_elevation_steps: IntProperty(name="Elevation Steps", default=5, min=1)
+    solve_speed_min: IntProperty(name="Speed Min (FPS)", default=2400, min=SPEED_SOUND_IN_FPS, max=100000)
+    solve_speed_max: IntProperty(name="Speed Max (FPS)", default=3000, min=SPEED_SOUND_IN_FPS, max=100000)
+    solve_speed_steps: IntProperty(name="Speed Steps", default=4, min=1)
+    solve_workers: IntProperty(name="Workers", default=0, min=0, max=256, description="Worker processes used by the solver. 0 uses every core, 1 solves inside Blender without extra processes")
+    solve_top_n: IntProperty(name="Candidates", default=10, min=1, max=1000, description="Number of best candidates to keep")
+    solutions: CollectionProperty(type=CALCRACK_PG_solution)
+    posterior_mass: FloatProperty(name="Credible Mass", default=.95, min=.5, max=.999, description="Share of the probability the Posterior Map's region must hold. Its most probable cells are kept until it does")
+    posterior_model_sigma: FloatProperty(name="Model Spread (s)", default=.002, min=0.0, max=.1, description="Timing spread added to every microphone's Confidence spread, for cell size, temperature and placement errors. Larger values widen the region")
+
+    record_history: BoolProperty(name="Record History", default=True, description="Save every evaluated candidate to a .calcrack.sqlite file next to the .blend file (the temp folder until it is saved)")
+    history_limit: IntProperty(name="Results", default=10, min=1, max=1000, description="Number of history candidates to list")
+    history_radius: FloatProperty(name="Radius (m)", default=5.0, min=0.0, description="Distance from the selected rifle searched by Nearby")
+    history_results: CollectionProperty(type=CALCRACK_PG_solution)
+
+    uncertainty_draws: IntProperty(name="Draws", default=2000, min=10, max=100000, description="Number of random scenarios each rifle is scored against")
+    uncertainty_temp_f: FloatProperty(name="Temperature Spread (F)", default=3.0, min=0.0, description="Standard deviation of the air temperature")
+    uncertainty_position: FloatProperty(name="Mic Position Spread (m)", default=.5, min=0.0, description="Standard deviation of each microphone's position, per axis")
+    uncertainty_speed: FloatProperty(name="Speed Spread (%)", default=2.0, min=0.0, max=50.0, description="Standard deviation of each rifle's projectile speed, as a percentage of it")
+    uncertainty_delta_t: FloatProperty(name="Delta T Spread", default=1.0, min=0.0, max=10.0, description="Scales the Delta T spread that follows each microphone's Confidence. 0 trusts every Delta T exactly")
+
 
 classes = [
+    CALCRACK_PG_solution,
     CALCRACK_PG_scene,
 ]
 
@@ -42,14 +129,29 @@ def register():
     bpy.types.Object.delta_t = FloatProperty(name="Delta T", default=0, min=0, max=100)
 
     bpy.types.Object.ammo_speed = IntProperty(name="Projectile Speed", description="Velocity of bullet, in Feet per Second (FPS)", default=1600, min=SPEED_SOUND_IN_FPS, max=100000)
+    bpy.types.Object.drag_model = EnumProperty(
+        name="Drag Model",
+        items=[
+            ('G1', "G1", "Flat-based bullets. Most published ballistic coefficients use this model"),
+            ('G7', "G7", "Long-range boat-tail bullets"),
+        ],
+        default='G1'
+    )
+    bpy.types.Object.ballistic_coeff = FloatProperty(name="Ballistic Coefficient", description="Ballistic coefficient of the bullet for the chosen drag model, in lb/in²", default=.45, min=.01, max=2.0)
     bpy.types.Object.confidence = IntProperty(name="Confidence", default=3, min=1, max=3)
+    bpy.types.Object.is_outlier = BoolProperty(name="Outlier", default=False, description="Find Outliers found this microphone inconsistent with the others")
     bpy.types.Object.aim_target = PointerProperty(name="Target", type=bpy.types.Object)
-    bpy.types.Object.aggregated_errors = FloatProperty(default=0, min=0, max=100)
-    bpy.types.Object.mean_error = FloatProperty(default=0, min=0, max=100)
+    bpy.types.Object.aggregated_errors = FloatProperty(default=0, min=0)  # No max: a clamped write never matches, so live update would rewrite it forever
+    bpy.types.Object.mean_error = FloatProperty(default=0, min=0)
     bpy.types.Object.duration_flight = FloatProperty(name="Simulation Duration (s)", default=.5, description="Length of simulation needed, in seconds")
     bpy.types.Object.time_crack = FloatProperty()
     bpy.types.Object.time_thump = FloatProperty()
     bpy.types.Object.simulated_error = FloatProperty()
+    bpy.types.Object.uncertainty_low = FloatProperty()
+    bpy.types.Object.uncertainty_median = FloatProperty()
+    bpy.types.Object.uncertainty_high = FloatProperty()
+    bpy.types.Object.uncertainty_best = FloatProperty()
+    bpy.types.Object.simulation_collection = PointerProperty(name="Simulation", type=bpy.types.Collection, description="Collection holding this rifle's simulation objects, reused on every Simulate")
     for cls in classes:
         register_class(cls)
     bpy.types.Scene.calcrack = PointerProperty(type=CALCRACK_PG_scene)
@@ -63,6 +165,11 @@ def unregister():
         unregister_class(cls)
 
     for prop in (
+        "uncertainty_low",
+        "uncertainty_median",
+        "uncertainty_high",
+        "uncertainty_best",
+        "simulation_collection",
         "time_crack",
         "time_thump",
         "simulated_error,"
@@ -71,8 +178,11 @@ def unregister():
         "aggregated_errors",
         "aim_target",
         "ammo_speed",
+        "drag_model",
+        "ballistic_coeff",
         "delta_t",
         "confidence",
+        "is_outlier",
     ):
         if hasattr(bpy.types.Object, prop):
             delattr(bpy.types.Object, prop)
@@ -7,6 +7,10 @@ import bpy
 from bpy.utils import register_class, unregister_class
 from bpy.types import Panel
 
+from .registry.registry import REGISTRY
+from .manager_adapter import LEADERBOARD, RESULT_CACHE
+from .maintenance.profiler import PROFILER, sparkline
+
 RIFLE_TYPE = 'SINGLE_ARROW'
 MIC_TYPE = 'MIC_TYPE'
 TARGET_TYPE = 'TARGET_TYPE'
@@ -55,12 +59,197 @@ class CALCRACK_PT_settings_ui(Panel, CalcrackBase):
         row = self.layout.row()
         row.prop(context.scene.calcrack, 'error_margin')
 
+        row = self.layout.row()
+        row.prop(context.scene.calcrack, 'air_drag')
+
+        row = self.layout.row()
+        row.prop(context.scene.calcrack, 'scoring')
+
+        row = self.layout.row()
+        row.prop(context.scene.calcrack, 'robust_scale')
+
+        row = self.layout.row()
+        row.operator('calcrack.mics_consensus', icon='ERROR')
+
         row = self.layout.row()
         row.prop(context.scene.calcrack, 'print_to_terminal')
+        if context.scene.calcrack.print_to_terminal:
+            col = self.layout.column(align=True)
+            row = col.row(align=True)
+            row.prop(context.scene.calcrack, 'print_terminal')
+            row.prop(context.scene.calcrack, 'print_lines_per_second', text="Lines/s")
+            col.prop(context.scene.calcrack, 'print_log_file')
 
         row = self.layout.row()
         row.prop(context.scene.calcrack, 'live_update')
 
+        row = self.layout.row()
+        row.active = context.scene.calcrack.live_update
+        row.prop(context.scene.calcrack, 'live_update_interval')
+
+        row = self.layout.row()
+        row.label(text=f"Cached Results: {RESULT_CACHE.hits} hits, {RESULT_CACHE.misses} misses ({round(RESULT_CACHE.hit_rate() * 100)}%).")
+
+        row = self.layout.row()
+        row.operator('calcrack.mics_import_wav', icon='FILE_SOUND')
+
+        col = self.layout.column(align=True)
+        col.prop(context.scene.calcrack, 'uncertainty_draws')
+        col.prop(context.scene.calcrack, 'uncertainty_temp_f')
+        col.prop(context.scene.calcrack, 'uncertainty_position')
+        col.prop(context.scene.calcrack, 'uncertainty_speed')
+        col.prop(context.scene.calcrack, 'uncertainty_delta_t')
+
+
+class CALCRACK_PT_performance_ui(Panel, CalcrackBase):
+    bl_label = "Performance"
+    bl_options = {'DEFAULT_CLOSED'}
+    
+    def draw(self, context):
+        row = self.layout.row()
+        row.prop(context.scene.calcrack, 'profiling')
+
+        row = self.layout.row(align=True)
+        row.operator('calcrack.profile_export', icon='EXPORT')
+        row.operator('calcrack.profile_clear', text="", icon='TRASH')
+
+        stats = PROFILER.stats()
+        if not stats:
+            return
+
+        box = self.layout.box()
+        row = box.row()
+        row.label(text="Mean / 95% / Max (ms). Histogram: 1 µs to 10 s")
+        for stat in stats:
+            col = box.column(align=True)
+            col.label(text=f"{stat['name']} ({stat['count']}x)")
+            col.label(text=f"{stat['mean'] * 1000:.2f} / {stat['p95'] * 1000:.2f} / {stat['max'] * 1000:.2f}   {sparkline(stat['histogram'])}")
+
+
+class CALCRACK_PT_solver_ui(Panel, CalcrackBase):
+    bl_label = "Solver"
+    
+    def draw(self, context):
+        settings = context.scene.calcrack
+        ao = context.active_object
+
+        self.layout.use_property_split = True
+        self.layout.use_property_decorate = False
+
+        row = self.layout.row()
+        row.prop(settings, 'solve_volume')
+
+        row = self.layout.row()
+        row.prop(settings, 'solve_cell_size')
+
+        col = self.layout.column(align=True)
+        col.prop(settings, 'solve_azimuth_steps')
+        col.prop(settings, 'solve_elevation_min')
+        col.prop(settings, 'solve_elevation_max')
+        col.prop(settings, 'solve_elevation_steps')
+
+        col = self.layout.column(align=True)
+        col.prop(settings, 'solve_speed_min')
+        col.prop(settings, 'solve_speed_max')
+        col.prop(settings, 'solve_speed_steps')
+
+        row = self.layout.row()
+        row.prop(settings, 'solve_top_n')
+
+        row = self.layout.row()
+        row.prop(settings, 'solve_workers')
+
+        if find_object_type(ao) != RIFLE_TYPE or not ao.aim_target:
+            row = self.layout.row()
+            row.label(text="Select a rifle with a target to solve.")
+            return
+
+        row = self.layout.row()
+        row.operator('calcrack.rifle_solve', icon='VIEWZOOM')
+
+        col = self.layout.column(align=True)
+        col.prop(settings, 'posterior_mass')
+        col.prop(settings, 'posterior_model_sigma')
+        col.operator('calcrack.rifle_posterior', icon='LIGHTPROBE_VOLUME')
+
+        if not len(settings.solutions):
+            return
+
+        box = self.layout.box()
+        box.label(text="Best Candidates:")
+        for index, solution in enumerate(settings.solutions):
+            row = box.row(align=True)
+            row.label(text=f"{index + 1}. Mean: {round(solution.mean_error, 3)}s. {solution.ammo_speed} FPS")
+            row.operator('calcrack.solution_apply', text="", icon='CHECKMARK').index = index
+
+
+class CALCRACK_PT_leaderboard_ui(Panel, CalcrackBase):
+    bl_label = "Leaderboard"
+    bl_options = {'DEFAULT_CLOSED'}
+    
+    def draw(self, context):
+        row = self.layout.row()
+        row.operator('calcrack.rifles_rank', icon='SORTSIZE')
+
+        rifles = REGISTRY.ensure(context.scene).rifles
+        standings = LEADERBOARD.standings([rifle.name for rifle in rifles])
+        if not standings:
+            row = self.layout.row()
+            row.label(text="Rank All, or turn on Live Update, to list every rifle here.")
+            return
+
+        ao = context.active_object
+        box = self.layout.box()
+        for standing in standings:
+            row = box.row(align=True)
+            row.operator(
+                'calcrack.rifle_select',
+                text=f"{standing.rank}. {standing.rifle}",
+                depress=ao is not None and ao.name == standing.rifle
+            ).name = standing.rifle
+            row.label(text=f"Mean: {round(standing.mean_error, 3)}s")
+            row.label(text=f"Worst: {standing.worst_mic} ({round(standing.worst_error, 3)}s)")
+
+
+class CALCRACK_PT_history_ui(Panel, CalcrackBase):
+    bl_label = "History"
+    bl_options = {'DEFAULT_CLOSED'}
+    
+    def draw(self, context):
+        settings = context.scene.calcrack
+        ao = context.active_object
+
+        self.layout.use_property_split = True
+        self.layout.use_property_decorate = False
+
+        row = self.layout.row()
+        row.prop(settings, 'record_history')
+
+        row = self.layout.row()
+        row.prop(settings, 'history_limit')
+
+        row = self.layout.row()
+        row.prop(settings, 'history_radius')
+
+        row = self.layout.row(align=True)
+        row.operator('calcrack.history_query', text="Best").kind = 'BEST'
+        if find_object_type(ao) == RIFLE_TYPE and ao.aim_target:
+            row.operator('calcrack.history_query', text="Nearby").kind = 'NEARBY'
+            row.operator('calcrack.history_query', text="This Rifle").kind = 'RIFLE'
+
+        if not len(settings.history_results):
+            return
+
+        can_apply = find_object_type(ao) == RIFLE_TYPE and ao.aim_target
+        box = self.layout.box()
+        for index, result in enumerate(settings.history_results):
+            row = box.row(align=True)
+            row.label(text=f"{index + 1}. Mean: {round(result.mean_error, 3)}s. {result.ammo_speed} FPS")
+            if can_apply:
+                apply = row.operator('calcrack.solution_apply', text="", icon='CHECKMARK')
+                apply.index = index
+                apply.collection = 'history_results'
+
 
 def find_object_type(ao):
     if ao.type not in ['MESH', 'CAMERA', 'EMPTY']:
@@ -98,22 +287,42 @@ def draw_rifle_ui(self, ao, scene):
     row.prop(ao, 'ammo_speed', text="Speed (FPS)")
     row.operator('calcrack.rifle_fire', text="", icon='EVENT_RIGHT_ARROW')
 
+    if scene.calcrack.air_drag:
+        row = box.row(align=True)
+        row.prop(ao, 'drag_model', text="")
+        row.prop(ao, 'ballistic_coeff', text="BC")
+
+    row = box.row(align=True)
+    row.prop(scene.calcrack, 'refine_speed')
+    row.operator('calcrack.rifle_refine', icon='DRIVER_DISTANCE')
+
     row = box.row()
     row.label(text=f"Aggregated Error: {round(ao.aggregated_errors, 3)}s.")
 
     row = box.row()
     row.label(text=f"Mean Error: {round(ao.mean_error, 3)}s.")
 
+    row = box.row()
+    row.operator('calcrack.rifles_uncertainty', icon='RNDCURVE')
+
+    if ao.uncertainty_high > 0.0:
+        row = box.row()
+        row.label(text=f"Mean Error 5-95%: {round(ao.uncertainty_low, 3)}-{round(ao.uncertainty_high, 3)}s (median {round(ao.uncertainty_median, 3)}s).")
+
+        row = box.row()
+        row.label(text=f"Best rifle in {round(ao.uncertainty_best * 100)}% of draws.")
+
 
     box = self.layout.box()
     box.label(text="Calculate Visually:")
 
-    row = box.row()
-    row.prop(scene.calcrack, 'air_drag')
-
     row = box.row(align=True)
     row.prop(ao, 'duration_flight')
     row.operator('calcrack.rifle_simulate', text="", icon='CONE')
+    row.operator('calcrack.rifle_simulation_clear', text="", icon='TRASH')
+
+    row = box.row()
+    row.operator('calcrack.rifle_arrivals_set', icon='TIME')
 
     row = box.row()
     row.label(text=f"Aggregated Error (Sim): {round(scene.calcrack.aggregated_errors, 3)}")
@@ -131,6 +340,10 @@ def draw_mic_ui(self, ao):
     row = self.layout.row()
     row.prop(ao, 'delta_t', text="Delta T")
 
+    if ao.is_outlier:
+        row = self.layout.row()
+        row.label(text="Disagrees with the other microphones.", icon='ERROR')
+
     self.layout.separator()
 
 
@@ -152,14 +365,7 @@ def draw_target_ui(self, ao):
     box = self.layout.box()
     box.label(text="Calculate Mathematically:")
 
-    for obj in bpy.context.scene.objects:
-        if not hasattr(obj, 'aim_target'):
-            continue
-        if not obj.aim_target:
-            continue
-        if obj.aim_target is not ao:
-            continue
-
+    for obj in REGISTRY.ensure(bpy.context.scene).target_rifles.get(ao.as_pointer(), ()):
         box = box.box()
         row = box.row()
         row.label(text=f'''Rifle "{obj.name}"''')
@@ -176,7 +382,11 @@ def draw_target_ui(self, ao):
 
 classes = [
     CALCRACK_PT_object_ui,
-    CALCRACK_PT_settings_ui
+    CALCRACK_PT_leaderboard_ui,
+    CALCRACK_PT_settings_ui,
+    CALCRACK_PT_performance_ui,
+    CALCRACK_PT_solver_ui,
+    CALCRACK_PT_history_ui
 ]
 
 
@@ -0,0 +1,169 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import hashlib
+
+import bpy
+import numpy as np
+
+from ..maintenance.profiler import timed
+
+
+class Registry:
+    '''
+    Context: Every evaluation used to scan all of scene.objects to find the mics and rifles. Photogrammetry
+    scenes hold thousands of objects, only a handful of which are Calcrack's.
+
+    Solution: We scan once, keep the mics as contiguous arrays and the rifles as a list, and afterwards only
+    patch the rows the depsgraph reports as changed.
+
+    Invalidation: Adding, deleting or relinking objects tags an update on a collection, which triggers a rescan.
+    Objects linked straight to the scene tag the scene instead, along with every settings change, so a scene
+    update only rescans when members_changed finds a difference. Undo, redo and file loads also rescan, since
+    they replace every object we hold a reference to. Renames are patched in place.
+    '''
+    def __init__(self):
+        self.is_valid = False
+
+    def invalidate(self):
+        self.is_valid = False
+
+    def ensure(self, scene):
+        if not self.is_valid or self.scene_name != scene.name:
+            self.rebuild(scene)
+        return self
+
+    @timed("registry.rebuild")
+    def rebuild(self, scene):
+        mics = []
+        rifles = []
+        for obj in scene.objects:
+            if obj.type == 'CAMERA' and obj.delta_t != 0.0:
+                mics.append(obj)
+            elif obj.type == 'MESH' and obj.aim_target:
+                rifles.append(obj)
+
+        self.mics = mics
+        self.mic_index = {mic.as_pointer(): i for i, mic in enumerate(mics)}
+        self.mic_names = [mic.name for mic in mics]
+        self.mic_positions = np.array([mic.matrix_world.translation for mic in mics], dtype=np.float64).reshape(-1, 3)
+        self.actual_delta_ts = np.array([round(mic.delta_t, 3) for mic in mics], dtype=np.float64)
+        self.mic_confidences = np.array([mic.confidence for mic in mics], dtype=np.int32)
+
+        self.rifles = rifles
+        self.rifle_targets = {rifle.as_pointer(): rifle.aim_target.as_pointer() for rifle in rifles}  # As registered
+        self.target_rifles = {}
+        for rifle in rifles:
+            self.target_rifles.setdefault(rifle.aim_target.as_pointer(), []).append(rifle)
+
+        self.mic_hash = None
+        self.scene_name = scene.name
+        self.top_level = top_level_counts(scene)
+        self.is_valid = True
+
+    @timed("registry.apply_updates")
+    def apply_updates(self, scene, depsgraph):
+        '''Patches changed mics in place and returns the rifles whose results may have changed.'''
+        if not self.is_valid or self.scene_name != scene.name:
+            self.rebuild(scene)
+            return list(self.rifles)
+
+        affected = {}
+        mics_changed = False
+        for update in depsgraph.updates:
+            id_data = update.id.original
+            if isinstance(id_data, bpy.types.Collection):
+                self.invalidate()  # Objects were added, deleted or relinked
+                continue
+            if isinstance(id_data, bpy.types.Scene):
+                if self.members_changed(scene):
+                    self.invalidate()
+                continue
+            if not isinstance(id_data, bpy.types.Object):
+                continue
+
+            pointer = id_data.as_pointer()
+            if id_data.type == 'CAMERA':
+                mics_changed |= self.update_mic(id_data, pointer)
+                continue
+
+            if pointer in self.rifle_targets or (id_data.type == 'MESH' and id_data.aim_target):
+                if not id_data.aim_target or self.rifle_targets.get(pointer) != id_data.aim_target.as_pointer():
+                    self.invalidate()  # New rifle, or a target was set, cleared or swapped
+                affected[pointer] = id_data
+
+            for rifle in self.target_rifles.get(pointer, ()):
+                affected[rifle.as_pointer()] = rifle
+
+        if not self.is_valid:
+            mic_hash = self.mic_set_hash()
+            rifle_targets = self.rifle_targets
+            self.rebuild(scene)
+            mics_changed |= self.mic_set_hash() != mic_hash
+            for rifle in self.rifles:
+                if rifle.as_pointer() not in rifle_targets:
+                    affected[rifle.as_pointer()] = rifle  # Linked into the scene, or just became a rifle
+
+        if mics_changed:
+            return list(self.rifles)
+        return [rifle for rifle in affected.values() if rifle.aim_target]
+
+    def members_changed(self, scene):
+        '''
+        Whether objects were linked to or unlinked from the scene collection, or one of ours was deleted.
+        Costs the mics and rifles we hold, not the scene's object count.
+        '''
+        if top_level_counts(scene) != self.top_level:
+            return True
+        try:
+            for obj in self.mics + self.rifles:
+                obj.name  # Raises once the object was deleted
+        except ReferenceError:
+            return True
+        return False
+
+    def update_mic(self, obj, pointer):
+        '''Refreshes one mic's row. Returns True when anything the Algorithm reads changed.'''
+        i = self.mic_index.get(pointer)
+        if i is None:
+            if obj.delta_t == 0.0:
+                return False
+            self.invalidate()  # A camera just became a mic
+            return True
+
+        if obj.delta_t == 0.0:
+            self.invalidate()  # A mic stopped being one
+            return True
+
+        position = tuple(obj.matrix_world.translation)
+        delta_t = round(obj.delta_t, 3)
+        changed = (
+            tuple(self.mic_positions[i]) != position or
+            self.actual_delta_ts[i] != delta_t or
+            self.mic_confidences[i] != obj.confidence
+        )
+
+        self.mic_names[i] = obj.name
+        self.mic_positions[i] = position
+        self.actual_delta_ts[i] = delta_t
+        self.mic_confidences[i] = obj.confidence
+        if changed:
+            self.mic_hash = None
+        return changed
+
+    def mic_set_hash(self):
+        '''Digest of every mic position and delta-t. Equal after undo restores the same mics, unlike a version counter.'''
+        if self.mic_hash is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(self.mic_positions.tobytes())
+            digest.update(self.actual_delta_ts.tobytes())
+            self.mic_hash = digest.hexdigest()
+        return self.mic_hash
+
+
+def top_level_counts(scene):
+    return len(scene.collection.objects), len(scene.collection.children)
+
+
+REGISTRY = Registry()
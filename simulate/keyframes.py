@@ -0,0 +1,44 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bpy
+import numpy as np
+
+KEYFRAME_INTERPOLATION_LINEAR = 1  # Enum value of 'LINEAR' in Keyframe.interpolation, as foreach_set expects
+
+
+def write_keyframes(obj, data_path, frames, values):
+    '''
+    Keys every component of obj.data_path at once with linear interpolation.
+
+    Builds the action and F-curves directly, so there is no scene.frame_set, no depsgraph evaluation and no
+    per-keyframe operator call. Any keys already on those F-curves are replaced.
+
+    frames : (K,) frame numbers
+    values : (K, components) value per frame
+    '''
+    frames = np.asarray(frames, dtype=np.float32)
+    values = np.asarray(values, dtype=np.float32).reshape(len(frames), -1)
+
+    anim = obj.animation_data or obj.animation_data_create()
+    action = anim.action
+    if action is None:
+        action = bpy.data.actions.new(f"{obj.name}Action")
+        action.id_root = 'OBJECT'
+
+    for index in range(values.shape[1]):
+        fcurve = action.fcurves.find(data_path, index=index) or action.fcurves.new(data_path, index=index)
+        points = fcurve.keyframe_points
+        points.clear()
+        points.add(len(frames))
+
+        co = np.column_stack((frames, values[:, index])).ravel()
+        points.foreach_set('co', co)
+        points.foreach_set('handle_left', co)
+        points.foreach_set('handle_right', co)
+        points.foreach_set('interpolation', np.full(len(frames), KEYFRAME_INTERPOLATION_LINEAR, dtype=np.int32))
+        fcurve.update()
+
+    if anim.action is None:
+        anim.action = action  # Assigned after the F-curves exist so the action's slot binds to this object
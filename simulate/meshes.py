@@ -0,0 +1,44 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bpy
+import bmesh
+from mathutils import Matrix
+
+BLAST_SPHERE_MESH_NAME = "Calcrack_Muzzle_Blast"
+BLAST_SPHERE_SEGMENTS = 32
+BLAST_SPHERE_RING_COUNT = 16
+BASE_SPHERE_RADIUS = 1.0
+CONE_SEGMENTS = 32
+
+
+def get_blast_sphere_mesh():
+    '''One muzzle blast sphere mesh shared by every rifle's simulation.'''
+    mesh = bpy.data.meshes.get(BLAST_SPHERE_MESH_NAME)
+    if mesh is not None:
+        return mesh
+
+    mesh = bpy.data.meshes.new(BLAST_SPHERE_MESH_NAME)
+    bm = bmesh.new()
+    bmesh.ops.create_uvsphere(bm, u_segments=BLAST_SPHERE_SEGMENTS, v_segments=BLAST_SPHERE_RING_COUNT, radius=BASE_SPHERE_RADIUS)
+    bm.to_mesh(mesh)
+    bm.free()
+    return mesh
+
+
+def write_cone_mesh(mesh, radius, depth):
+    '''Replaces the mesh with a cone whose tip is at the origin and whose base lies depth below it on -Z.'''
+    bm = bmesh.new()
+    bmesh.ops.create_cone(
+        bm,
+        cap_ends=True,
+        segments=CONE_SEGMENTS,
+        radius1=radius,
+        radius2=0.0,
+        depth=depth,
+        matrix=Matrix.Translation((0.0, 0.0, -depth / 2.0))
+    )
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.update()
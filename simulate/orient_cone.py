@@ -4,8 +4,8 @@
 
 
 def get_cone_orientation(self):
-    rifle_location = self.Algorithm.rifle_origin_world 
-    target_location = self.Algorithm.rifle_endpoint
+    rifle_location = self.origin
+    target_location = self.endpoint
     direction = (target_location - rifle_location)
     dir_unit = direction.normalized()
     quat = dir_unit.to_track_quat('Z', 'Y')
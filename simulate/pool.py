@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bpy
+
+COLLECTION_PREFIX = "Calcrack_Sim_"
+ROLE_KEY = "calcrack_role"
+
+
+class SimulationPool:
+    '''
+    Context: Every Simulate press used to add a new cone, blast sphere, bullet and hundreds of sound spheres
+    without removing the previous ones. Stale objects piled up and slowed down every object scan and depsgraph update.
+
+    Solution: Each rifle owns one collection of simulation objects. An object is looked up by its role
+    (e.g. "Mach_Cone" or "Sound_0042") and reused in place. Whatever a run did not ask for is removed in one
+    bpy.data.batch_remove call, together with the meshes and actions only it used.
+    '''
+    def __init__(self, scene, rifle):
+        self.scene = scene
+        self.collection = get_rifle_collection(scene, rifle)
+        self.unused = {obj[ROLE_KEY]: obj for obj in self.collection.objects if ROLE_KEY in obj}  # Never touch objects the user added
+        self.stale = []
+
+    def object(self, role, data=None):
+        '''Existing object for this role with its transform and animation reset, or a new one.'''
+        obj = self.unused.pop(role, None)
+        if obj is not None and (obj.data is None) != (data is None):
+            self.stale.append(obj)  # An empty can't become a mesh object, or vice versa
+            obj = None
+
+        if obj is None:
+            obj = bpy.data.objects.new(role, data)
+            obj[ROLE_KEY] = role
+            self.collection.objects.link(obj)
+            return obj
+
+        if data is not None and obj.data != data:
+            old_data = obj.data
+            obj.data = data
+            if old_data.users == 0:
+                bpy.data.meshes.remove(old_data)
+
+        reset_object(obj)
+        return obj
+
+    def mesh_object(self, role):
+        '''Like object(), but with a mesh of its own that the caller rewrites in place.'''
+        obj = self.unused.get(role)
+        if obj is not None and obj.type == 'MESH' and obj.data.users == 1:
+            return self.object(role, obj.data)
+        return self.object(role, bpy.data.meshes.new(role))
+
+    def release(self):
+        '''Removes every object this run did not reuse.'''
+        remove_objects(list(self.unused.values()) + self.stale)
+        self.unused = {}
+        self.stale = []
+
+
+def get_rifle_collection(scene, rifle):
+    collection = rifle.simulation_collection
+    if collection is None:
+        collection = bpy.data.collections.new(f"{COLLECTION_PREFIX}{rifle.name}")
+        rifle.simulation_collection = collection
+
+    if collection not in scene.collection.children_recursive:
+        scene.collection.children.link(collection)
+    return collection
+
+
+def reset_object(obj):
+    obj.parent = None
+    obj.matrix_parent_inverse.identity()
+    obj.location = (0.0, 0.0, 0.0)
+    obj.rotation_mode = 'XYZ'
+    obj.rotation_euler = (0.0, 0.0, 0.0)
+    obj.scale = (1.0, 1.0, 1.0)
+
+    if obj.animation_data and obj.animation_data.action:
+        obj.animation_data.action.fcurves.clear()
+
+
+def remove_objects(objects):
+    '''Objects plus the meshes and actions nothing else uses, in one pass over bpy.data.'''
+    ids = set(objects)
+    if not ids:
+        return
+
+    for obj in objects:
+        if obj.data is not None and obj.data.users == 1:
+            ids.add(obj.data)
+        if obj.animation_data and obj.animation_data.action and obj.animation_data.action.users == 1:
+            ids.add(obj.animation_data.action)
+    bpy.data.batch_remove(ids)
+
+
+def clear_simulation(rifle):
+    '''Removes a rifle's simulation objects, and its collection once nothing the user added is left in it.'''
+    collection = rifle.simulation_collection
+    if collection is None:
+        return 0
+
+    objects = [obj for obj in collection.objects if ROLE_KEY in obj]
+    remove_objects(objects)
+    if len(collection.objects) == 0 and not collection.children:
+        bpy.data.collections.remove(collection)
+        rifle.simulation_collection = None
+    return len(objects)
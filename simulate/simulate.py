@@ -2,20 +2,22 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import bpy
 import math
+from mathutils import Vector
 
 from .mach_angle import find_mach_angle
 from .orient_cone import get_cone_orientation
 from .scale_cone import get_cone_final_scale
 from .scale_sphere import get_sphere_final_scale
+from .keyframes import write_keyframes
+from .meshes import get_blast_sphere_mesh, write_cone_mesh
+from .pool import SimulationPool
+from ..maintenance.profiler import timed
 
 DEG_TO_RAD = 0.0174533
 SECONDS_PER_FRAME = 0.001
 BASE_CONE_DEPTH = 2.0
-BASE_SPHERE_RADIUS = 1.0
 START_SCALE = 1e-4
-KEYFRAME_INTERPOLATION = 'LINEAR'
 
 
 class Simulate:
@@ -33,26 +35,28 @@ class Simulate:
         self.ao = ao
         self.Algorithm = Algorithm
 
+        self.origin = Vector(self.Algorithm.rifle_origin_world)
+        self.endpoint = Vector(self.Algorithm.rifle_endpoint)
 
+
+    @timed("simulate.execute")
     def execute(self):
         self.get_mach_angle()
         self.get_cone_orientation()
         self.get_cone_final_scale()
         self.get_sphere_final_scale()
         self.prepare_blender_timeline()
+        self.get_pool()
         self.create_objects()
         self.create_bullet()
         self.parent_cone_to_bullet()
         self.orient_cone()
 
         self.scale_objects_start()
-        self.keyframe_objects_start()
-
-        self.scale_objects_end()
-        self.keyframe_objects_end()
-
-        self.keyframe_bullet_start()
-        self.keyframe_bullet_end()
+        self.keyframe_objects()
+        self.keyframe_bullet()
+        self.Pool.release()
+        self.scene.frame_current = self.start_frame  # Only once everything is built. frame_set() would evaluate the whole scene now
 
 
     def get_mach_angle(self):
@@ -76,49 +80,31 @@ class Simulate:
 
         self.scene.frame_start = self.start_frame
         self.scene.frame_end = self.end_frame
-        self.scene.frame_set(self.start_frame)
 
+    @timed("simulate.get_pool")
+    def get_pool(self):
+        self.Pool = SimulationPool(self.scene, self.ao)
+
+    @timed("simulate.create_objects")
     def create_objects(self):
-        origin = self.Algorithm.rifle_origin_world 
         mach_angle_rad = self.mach_angle * DEG_TO_RAD
 
-        bpy.ops.mesh.primitive_cone_add(
-            vertices=32,
-            radius1=BASE_CONE_DEPTH * math.tan(mach_angle_rad),
-            radius2=0.0,
-            depth=BASE_CONE_DEPTH,
-            enter_editmode=True,
-            location=origin
-        )
-
-        self.cone_obj = bpy.context.active_object
-        self.cone_obj.name = "Mach_Cone"
-
-        bpy.ops.transform.translate(value=(0, 0, -BASE_CONE_DEPTH / 2.0))
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        bpy.ops.mesh.primitive_uv_sphere_add(
-            segments=32,
-            ring_count=16,
-            radius=BASE_SPHERE_RADIUS,
-            enter_editmode=False,
-            location=origin
-        )
-        self.sphere_obj = bpy.context.active_object
-        self.sphere_obj.name = "Muzzle_Blast"
+        self.cone_obj = self.Pool.mesh_object("Mach_Cone")
+        write_cone_mesh(self.cone_obj.data, BASE_CONE_DEPTH * math.tan(mach_angle_rad), BASE_CONE_DEPTH)
+
+        self.sphere_obj = self.Pool.object("Muzzle_Blast", get_blast_sphere_mesh())
+        self.sphere_obj.location = self.origin
 
         self.cone_obj.display_type = 'WIRE'
         self.sphere_obj.display_type = 'WIRE'
 
     def create_bullet(self):
-        origin = self.Algorithm.rifle_origin_world
-        self.bullet_obj = bpy.data.objects.new("Bullet_Apex", None)
-        bpy.context.collection.objects.link(self.bullet_obj)
-        self.bullet_obj.location = origin
+        self.bullet_obj = self.Pool.object("Bullet_Apex")
+        self.bullet_obj.location = self.origin
 
     def parent_cone_to_bullet(self):
         self.cone_obj.parent = self.bullet_obj
-        self.cone_obj.matrix_parent_inverse = self.bullet_obj.matrix_world.inverted()
+        self.cone_obj.matrix_parent_inverse.identity()
         self.cone_obj.location = (0.0, 0.0, -BASE_CONE_DEPTH / 2.0)
         self.cone_obj.rotation_euler = (0.0, 0.0, 0.0)
         self.cone_obj.scale = (1.0, 1.0, 1.0)
@@ -132,56 +118,23 @@ class Simulate:
         self.cone_obj.scale = (s, s, s)
         self.sphere_obj.scale = (s, s, s)
 
-    def keyframe_objects_start(self):
-        self.scene.frame_set(self.start_frame)
-
-        self.cone_obj.keyframe_insert(data_path="scale", frame=self.start_frame)
-        self.sphere_obj.keyframe_insert(data_path="scale", frame=self.start_frame)
-
-        set_linear(self.cone_obj)
-        set_linear(self.sphere_obj)
-
-    def scale_objects_end(self):
-        self.scene.frame_set(self.end_frame)
-        s = self.final_cone_scale
-        self.cone_obj.scale = (s, s, s)
-
-        s = self.final_sphere_scale
-        self.sphere_obj.scale = (s, s, s)
-
-    def keyframe_objects_end(self):
-        self.cone_obj.keyframe_insert(data_path="scale", frame=self.end_frame)
-        self.sphere_obj.keyframe_insert(data_path="scale", frame=self.end_frame)
+    @timed("simulate.keyframe_objects")
+    def keyframe_objects(self):
+        frames = (self.start_frame, self.end_frame)
 
-        set_linear(self.cone_obj)
-        set_linear(self.sphere_obj)
+        s, e = START_SCALE, self.final_cone_scale
+        write_keyframes(self.cone_obj, "scale", frames, ((s, s, s), (e, e, e)))
 
-    def keyframe_bullet_start(self):
-        origin = self.Algorithm.rifle_origin_world
-        self.scene.frame_set(self.start_frame)
-        self.bullet_obj.location = origin
-        self.bullet_obj.keyframe_insert(data_path="location", frame=self.start_frame)
-        set_linear(self.bullet_obj)
+        e = self.final_sphere_scale
+        write_keyframes(self.sphere_obj, "scale", frames, ((s, s, s), (e, e, e)))
 
-    def keyframe_bullet_end(self):
-        origin = self.Algorithm.rifle_origin_world
+    @timed("simulate.keyframe_bullet")
+    def keyframe_bullet(self):
+        origin = self.origin
         duration_flight = self.Algorithm.rifle.duration_flight
         v = self.Algorithm.bullet_speed_mps
         bullet_distance = duration_flight * v
 
-        self.scene.frame_set(self.end_frame)
-        self.bullet_obj.location = origin + (self.dir_unit * bullet_distance)
-        self.bullet_obj.keyframe_insert(data_path="location", frame=self.end_frame)
-        set_linear(self.bullet_obj)
-
-
-def set_linear(obj):
-    if not obj.animation_data:
-        return
-    action = obj.animation_data.action
-    if not action:
-        return
-
-    for fcurve in action.fcurves:
-        for kp in fcurve.keyframe_points:
-            kp.interpolation = KEYFRAME_INTERPOLATION
\ No newline at end of file
+        self.bullet_obj.location = origin
+        end_location = origin + (self.dir_unit * bullet_distance)
+        write_keyframes(self.bullet_obj, "location", (self.start_frame, self.end_frame), (origin, end_location))
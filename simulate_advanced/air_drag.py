@@ -4,10 +4,11 @@
 
 import math
 
+from ..algorithm.ballistics import distance_at_time as table_distance_at_time
+
 BALLISTIC_COEFF = 0.45
 BULLET_MASS_GRAINS = 150.0
 BULLET_DIAMETER_INCH = 0.308
-AIR_DENSITY_KG_M3 = 1.225
 
 GRAINS_TO_KG = 0.00006479891
 INCH_TO_M = 0.0254
@@ -26,5 +27,5 @@ def bullet_area_m2():
     return math.pi * radius * radius
 
 
-def distance_at_time(t_seconds, muzzle_velocity_mps):
-    return muzzle_velocity_mps * t_seconds
\ No newline at end of file
+def distance_at_time(t_seconds, table):
+    return float(table_distance_at_time(t_seconds, table))
\ No newline at end of file
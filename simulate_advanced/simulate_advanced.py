@@ -2,19 +2,22 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import bpy
 import math
 from mathutils import Vector
 
 from .scale_thump import get_sphere_final_scale
 from .air_drag import distance_at_time
+from .sound_sphere import get_sound_sphere_mesh
+from ..algorithm.algorithm import get_flight_table
+from ..simulate.keyframes import write_keyframes
+from ..simulate.meshes import get_blast_sphere_mesh
+from ..simulate.pool import SimulationPool
+from ..maintenance.profiler import timed
 
 SECONDS_PER_FRAME = 0.001
 FRAME_STEP = 5
 DRAG_COEFF = 0.12
-BASE_SPHERE_RADIUS = 1.0
 START_SCALE = 1e-4
-KEYFRAME_INTERPOLATION = 'LINEAR'
 
 
 class SimulateAdvanced:
@@ -27,7 +30,7 @@ class SimulateAdvanced:
 
     Outputs: It just creates a muzzle blast sphere, an empty representing the bullet, and spheres along the
     empty's path representing its sound. The mach cone naturally arises from this setup as the spheres grow at
-    the speed of sound.
+    the speed of sound. The bullet slows down along its path according to its drag model.
     '''
     def __init__(self, scene, ao, Algorithm):
         self.scene = scene
@@ -42,24 +45,24 @@ class SimulateAdvanced:
             raise ValueError("rifle_endpoint is the same as rifle_origin_world")
 
         self.dir_unit = direction.normalized()
+        self.flight_table = get_flight_table(self.Algorithm.rifle, self.Algorithm.bullet_speed_mps, self.Algorithm.speed_sound_mps)  # The table Fire uses
 
+    @timed("simulate_advanced.execute")
     def execute(self):
         self.get_sphere_final_scale()
         self.prepare_blender_timeline()
+        self.get_pool()
         self.create_muzzle_blast()
         self.create_bullet()
         self.create_frames_dict()
 
         self.scale_blast_start()
-        self.keyframe_blast_start()
-
-        self.scale_objects_end()
-        self.keyframe_objects_end()
-
-        self.keyframe_bullet_start()
-        self.keyframe_bullet_end()
+        self.keyframe_blast()
 
         self.process_bullet_frames()
+        self.keyframe_bullet()
+        self.Pool.release()
+        self.scene.frame_current = self.start_frame  # Only once everything is built. frame_set() would evaluate the whole scene now
 
     def get_sphere_final_scale(self):
         self.final_sphere_scale = get_sphere_final_scale(self)
@@ -73,25 +76,22 @@ class SimulateAdvanced:
 
         self.scene.frame_start = self.start_frame
         self.scene.frame_end = self.end_frame
-        self.scene.frame_set(self.start_frame)
 
+    @timed("simulate_advanced.get_pool")
+    def get_pool(self):
+        self.Pool = SimulationPool(self.scene, self.ao)
+
+    @timed("simulate_advanced.create_muzzle_blast")
     def create_muzzle_blast(self):
-        bpy.ops.mesh.primitive_uv_sphere_add(
-            segments=32,
-            ring_count=16,
-            radius=BASE_SPHERE_RADIUS,
-            enter_editmode=False,
-            location=self.origin
-        )
-        self.sphere_obj = bpy.context.active_object
-        self.sphere_obj.name = "Muzzle_Blast"
+        self.sphere_obj = self.Pool.object("Muzzle_Blast", get_blast_sphere_mesh())
+        self.sphere_obj.location = self.origin
         self.sphere_obj.display_type = 'WIRE'
 
     def create_bullet(self):
-        self.bullet_obj = bpy.data.objects.new("Bullet_Apex", None)
-        self.scene.collection.objects.link(self.bullet_obj)
+        self.bullet_obj = self.Pool.object("Bullet_Apex")
         self.bullet_obj.location = self.origin
 
+    @timed("simulate_advanced.create_frames_dict")
     def create_frames_dict(self):
         frames = {}
 
@@ -110,65 +110,40 @@ class SimulateAdvanced:
         s = START_SCALE
         self.sphere_obj.scale = (s, s, s)
 
-    def keyframe_blast_start(self):
-        self.scene.frame_set(self.start_frame)
-        self.sphere_obj.keyframe_insert(data_path="scale", frame=self.start_frame)
-        set_linear(self.sphere_obj)
+    def keyframe_blast(self):
+        s, e = START_SCALE, self.final_sphere_scale
+        write_keyframes(self.sphere_obj, "scale", (self.start_frame, self.end_frame), ((s, s, s), (e, e, e)))
 
+    @timed("simulate_advanced.process_bullet_frames")
     def process_bullet_frames(self):
+        self.sound_mesh = get_sound_sphere_mesh()
         for frame, (location, final_scale) in self.frames_dict.items():
             self.sphere_add(frame, location, final_scale)
 
     def sphere_add(self, frame, location, final_scale):
-        bpy.ops.mesh.primitive_uv_sphere_add(
-            segments=24,
-            ring_count=12,
-            radius=BASE_SPHERE_RADIUS,
-            enter_editmode=False,
-            location=location
-        )
-        obj = bpy.context.active_object
-        obj.name = f"Sound_{frame:04d}"
+        obj = self.Pool.object(f"Sound_{frame:04d}", self.sound_mesh)
+        obj.location = location
         obj.display_type = 'WIRE'
 
-        self.scene.frame_set(frame)
-        obj.scale = (START_SCALE, START_SCALE, START_SCALE)
-        obj.keyframe_insert(data_path="scale", frame=frame)
+        s, e = START_SCALE, final_scale
+        obj.scale = (s, s, s)
+        write_keyframes(obj, "scale", (frame, self.end_frame), ((s, s, s), (e, e, e)))
 
-        self.scene.frame_set(self.end_frame)
-        obj.scale = (final_scale, final_scale, final_scale)
-        obj.keyframe_insert(data_path="scale", frame=self.end_frame)
-
-        set_linear(obj)
-
-    def scale_objects_end(self):
-        self.scene.frame_set(self.end_frame)
-        s = self.final_sphere_scale
-        self.sphere_obj.scale = (s, s, s)
+    @timed("simulate_advanced.keyframe_bullet")
+    def keyframe_bullet(self):
+        end_location = self.time_to_position(float(self.Algorithm.rifle.duration_flight))
+        locations = {self.start_frame: self.origin, self.end_frame: end_location}
+        for frame, (location, _) in self.frames_dict.items():
+            locations[frame] = location  # Keyed at every emission so the empty slows down with the bullet
 
-    def keyframe_objects_end(self):
-        self.sphere_obj.keyframe_insert(data_path="scale", frame=self.end_frame)
-        set_linear(self.sphere_obj)
-
-    def keyframe_bullet_start(self):
-        self.scene.frame_set(self.start_frame)
-        self.bullet_obj.location = self.origin
-        self.bullet_obj.keyframe_insert(data_path="location", frame=self.start_frame)
-        set_linear(self.bullet_obj)
-
-    def keyframe_bullet_end(self):
-        self.scene.frame_set(self.end_frame)
-        self.bullet_obj.location = self.time_to_position(
-            float(self.Algorithm.rifle.duration_flight)
-        )
-        self.bullet_obj.keyframe_insert(data_path="location", frame=self.end_frame)
-        set_linear(self.bullet_obj)
+        frames = sorted(locations)
+        write_keyframes(self.bullet_obj, "location", frames, [locations[frame] for frame in frames])
 
     def frame_to_time(self, frame):
         return (frame - self.start_frame) * SECONDS_PER_FRAME
 
     def time_to_distance(self, t_seconds):
-        return distance_at_time(t_seconds, self.Algorithm.bullet_speed_mps)
+        return distance_at_time(t_seconds, self.flight_table)
 
     def time_to_position(self, t_seconds):
         return self.origin + (self.dir_unit * self.time_to_distance(t_seconds))
@@ -181,14 +156,3 @@ class SimulateAdvanced:
         scale = self.final_sphere_scale * (remaining_time / total_time)
         return max(START_SCALE, scale)
 
-
-def set_linear(obj):
-    if not obj.animation_data:
-        return
-    action = obj.animation_data.action
-    if not action:
-        return
-
-    for fcurve in action.fcurves:
-        for kp in fcurve.keyframe_points:
-            kp.interpolation = KEYFRAME_INTERPOLATION
\ No newline at end of file
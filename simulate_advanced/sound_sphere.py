@@ -0,0 +1,25 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bpy
+import bmesh
+
+SOUND_SPHERE_MESH_NAME = "Calcrack_Sound_Sphere"
+SEGMENTS = 24
+RING_COUNT = 12
+BASE_SPHERE_RADIUS = 1.0
+
+
+def get_sound_sphere_mesh():
+    '''One sphere mesh shared by every Sound_XXXX object, built with bmesh instead of the operator stack.'''
+    mesh = bpy.data.meshes.get(SOUND_SPHERE_MESH_NAME)
+    if mesh is not None:
+        return mesh
+
+    mesh = bpy.data.meshes.new(SOUND_SPHERE_MESH_NAME)
+    bm = bmesh.new()
+    bmesh.ops.create_uvsphere(bm, u_segments=SEGMENTS, v_segments=RING_COUNT, radius=BASE_SPHERE_RADIUS)
+    bm.to_mesh(mesh)
+    bm.free()
+    return mesh
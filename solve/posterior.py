@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import numpy as np
+
+from .solve import FPS_TO_MPS, Solve, build_cell_mesh, set_scene_mesh
+from ..algorithm.posterior import posterior_grid
+
+POSTERIOR_NAME = "Calcrack_Posterior"
+
+
+class PosteriorMap(Solve):
+    '''
+    Context: The Solver ranks candidates by error, but can't say how likely the best one is, or how far off the
+    shooter could still be.
+
+    Solution: Over the Solver's search volume and search space, we turn every candidate's per-mic errors into a
+    likelihood, with each mic's Confidence setting its timing spread, and average it over every aim and speed.
+    Normalized over the volume, that is the probability the shot came from each cell.
+
+    Outputs: A mesh of the cells in the credible region (e.g. 95%), shaded by probability.
+    '''
+    def execute(self):
+        self.prepare()
+        self.run_posterior()
+        self.create_region()
+        return self
+
+    def run_posterior(self):
+        self.Posterior = posterior_grid(
+            self.Algorithm.mic_positions,
+            self.Algorithm.actual_delta_ts,
+            self.Algorithm.mic_confidences,
+            self.Algorithm.speed_sound_mps,
+            self.settings.error_margin,
+            self.origins,
+            self.directions,
+            self.speeds_fps * FPS_TO_MPS,
+            model_sigma=self.settings.posterior_model_sigma,
+            credible_mass=self.settings.posterior_mass
+        )
+
+    def create_region(self):
+        region = np.flatnonzero(self.Posterior.credible)
+        mesh = build_posterior_mesh(self.origins[region], self.Posterior.probability[region], self.grid_shape, self.bounds_min, self.bounds_max)
+        self.region_obj = set_scene_mesh(self.scene, POSTERIOR_NAME, mesh)
+
+    def region_area(self):
+        '''Horizontal area of the credible region, in square meters. Cells stacked in Z count once.'''
+        cell_size = (np.asarray(self.bounds_max) - np.asarray(self.bounds_min)) / np.asarray(self.grid_shape)
+        columns = self.Posterior.credible.reshape(self.grid_shape).any(axis=2)
+        return float(columns.sum() * cell_size[0] * cell_size[1])
+
+
+def build_posterior_mesh(origins, probability, grid_shape, bounds_min, bounds_max):
+    '''One quad per credible cell, from white (least probable in the region) to blue (most probable).'''
+    mesh = build_cell_mesh(POSTERIOR_NAME, origins, grid_shape, bounds_min, bounds_max)
+    count = len(origins)
+
+    values = mesh.attributes.new("probability", 'FLOAT', 'FACE')
+    values.data.foreach_set('value', probability.astype(np.float32))
+
+    spread = np.ptp(probability) if count else 0.0
+    shade = (probability - probability.min()) / spread if spread > 0.0 else np.ones(count)
+    colors = np.column_stack((1.0 - shade, 1.0 - shade, np.ones(count), np.ones(count)))
+
+    posterior = mesh.color_attributes.new("posterior", 'FLOAT_COLOR', 'CORNER')
+    posterior.data.foreach_set('color', np.repeat(colors, 4, axis=0).ravel().astype(np.float32))
+    mesh.color_attributes.active_color = posterior
+    return mesh
@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import numpy as np
+from mathutils import Vector
+
+from ..algorithm.batch import aim_directions
+from ..algorithm.refine import refine
+
+FPS_TO_MPS = 0.3048
+DEFAULT_TARGET_DISTANCE = 100.0
+
+
+class Refine:
+    '''
+    Context: A candidate close to the answer still needs many small manual drags to settle.
+
+    Solution: Starting from the rifle's current pose, we run a least squares fit of the predicted delta-t values
+    to the actual ones, using the analytic derivatives of the mach cone math.
+
+    Outputs: The rifle and its target are moved to the refined pose, optionally with a refined bullet speed.
+    '''
+    def __init__(self, scene, ao, Algorithm, fit_speed=False):
+        self.scene = scene
+        self.ao = ao
+        self.Algorithm = Algorithm
+        self.fit_speed = fit_speed
+
+    def execute(self):
+        self.run_refine()
+        self.write_pose()
+        return self
+
+    def run_refine(self):
+        direction = aim_directions(self.Algorithm.rifle_origin_world, self.Algorithm.rifle_endpoint)[0]
+        self.origin, self.direction, self.bullet_speed_mps, self.cost, self.iterations = refine(
+            self.Algorithm.mic_positions,
+            self.Algorithm.actual_delta_ts,
+            self.Algorithm.rifle_origin_world,
+            direction,
+            self.Algorithm.bullet_speed_mps,
+            self.Algorithm.speed_sound_mps,
+            fit_speed=self.fit_speed
+        )
+
+    def write_pose(self):
+        target = self.ao.aim_target
+        distance = float(np.linalg.norm(self.Algorithm.rifle_endpoint - self.Algorithm.rifle_origin_world))
+        if distance == 0.0:
+            distance = DEFAULT_TARGET_DISTANCE
+
+        origin = Vector(self.origin)
+        self.ao.matrix_world.translation = origin
+        target.matrix_world.translation = origin + Vector(self.direction) * distance
+
+        if self.fit_speed:
+            self.ao.ammo_speed = int(round(self.bullet_speed_mps / FPS_TO_MPS))
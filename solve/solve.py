@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2026 Jordan Henshaw
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bpy
+import numpy as np
+from mathutils import Vector
+
+from ..algorithm.grid_search import grid_search, search_directions, search_origins
+from ..algorithm.sweep import Sweep, serialize_payload
+
+FPS_TO_MPS = 0.3048
+HEATMAP_NAME = "Calcrack_Heatmap"
+HEATMAP_CELL_FILL = 0.8  # Fraction of a cell each heatmap quad covers, so neighbors stay distinguishable
+
+
+class Solve:
+    '''
+    Context: Dragging the aim target by hand to find the best candidate takes hours.
+
+    Problem: We need to test every rifle origin in a search volume, aimed in every direction, at every bullet speed.
+
+    Solution: We sweep the whole candidate space in batched NumPy passes using the mic data the Algorithm already gathered,
+    either serially or farmed out to a pool of worker processes.
+
+    Outputs: The ranked best candidates in scene.calcrack.solutions, and a heatmap mesh with the smallest error found per cell.
+    '''
+    def __init__(self, scene, ao, Algorithm):
+        self.scene = scene
+        self.ao = ao
+        self.Algorithm = Algorithm
+        self.settings = scene.calcrack
+
+    def execute(self, workers=1):
+        self.prepare()
+        if workers == 1:
+            self.run_search()
+        else:
+            self.start_sweep(workers)
+            self.collect_sweep()
+        self.finish()
+        return self
+
+    def prepare(self):
+        self.get_search_volume()
+        self.get_search_space()
+
+    def finish(self):
+        self.write_solutions()
+        self.create_heatmap()
+
+    def get_search_volume(self):
+        volume = self.settings.solve_volume
+        corners = np.array([volume.matrix_world @ Vector(corner) for corner in volume.bound_box])
+        self.bounds_min = corners.min(axis=0)
+        self.bounds_max = corners.max(axis=0)
+
+    def get_search_space(self):
+        settings = self.settings
+        self.origins, self.grid_shape = search_origins(self.bounds_min, self.bounds_max, settings.solve_cell_size)
+        self.directions = search_directions(
+            settings.solve_azimuth_steps,
+            settings.solve_elevation_min,
+            settings.solve_elevation_max,
+            settings.solve_elevation_steps
+        )
+        self.speeds_fps = np.linspace(settings.solve_speed_min, settings.solve_speed_max, max(1, settings.solve_speed_steps))
+        self.evaluations = len(self.origins) * len(self.directions) * len(self.speeds_fps)
+
+    def run_search(self):
+        self.best, self.min_errors = grid_search(
+            self.Algorithm.mic_positions,
+            self.Algorithm.actual_delta_ts,
+            self.Algorithm.speed_sound_mps,
+            self.settings.error_margin,
+            self.origins,
+            self.directions,
+            self.speeds_fps * FPS_TO_MPS,
+            top_n=self.settings.solve_top_n,
+            scoring=self.settings.scoring,
+            robust_scale=self.settings.robust_scale
+        )
+
+    def start_sweep(self, workers):
+        payload = serialize_payload(
+            self.Algorithm.mic_positions,
+            self.Algorithm.actual_delta_ts,
+            self.Algorithm.speed_sound_mps,
+            self.settings.error_margin,
+            self.origins,
+            self.directions,
+            self.speeds_fps * FPS_TO_MPS,
+            self.settings.solve_top_n,
+            self.settings.scoring,
+            self.settings.robust_scale
+        )
+        self.Sweep = Sweep(payload, len(self.origins), self.settings.solve_top_n, workers).start()
+
+    def collect_sweep(self):
+        self.best, self.min_errors = self.Sweep.reduce()
+
+    def write_solutions(self):
+        solutions = self.settings.solutions
+        solutions.clear()
+
+        mic_count = max(1, len(self.Algorithm.mic_names))
+        for error, origin_idx, direction_idx, speed_idx in self.best:
+            solution = solutions.add()
+            solution.origin = self.origins[int(origin_idx)]
+            solution.direction = self.directions[int(direction_idx)]
+            solution.ammo_speed = int(round(self.speeds_fps[int(speed_idx)]))
+            solution.aggregated_errors = round(float(error), 3)
+            solution.mean_error = solution.aggregated_errors / mic_count
+
+    def create_heatmap(self):
+        mesh = build_heatmap_mesh(self.origins, self.min_errors, self.grid_shape, self.bounds_min, self.bounds_max)
+        self.heatmap_obj = set_scene_mesh(self.scene, HEATMAP_NAME, mesh)
+
+
+def set_scene_mesh(scene, name, mesh):
+    '''The object called name, created if needed, now showing mesh. Its previous mesh is removed once unused.'''
+    obj = bpy.data.objects.get(name)
+    if obj is None:
+        obj = bpy.data.objects.new(name, mesh)
+        scene.collection.objects.link(obj)
+    else:
+        old_mesh = obj.data
+        obj.data = mesh
+        if old_mesh.users == 0:
+            bpy.data.meshes.remove(old_mesh)
+
+    obj.matrix_world.identity()
+    return obj
+
+
+def build_heatmap_mesh(origins, min_errors, grid_shape, bounds_min, bounds_max):
+    '''One horizontal quad per search cell, colored green (best) to red (worst) by its smallest error.'''
+    mesh = build_cell_mesh(HEATMAP_NAME, origins, grid_shape, bounds_min, bounds_max, HEATMAP_CELL_FILL)
+    count = len(origins)
+
+    errors = mesh.attributes.new("min_error", 'FLOAT', 'FACE')
+    errors.data.foreach_set('value', min_errors.astype(np.float32))
+
+    low, high = float(min_errors.min()), float(min_errors.max())
+    normalized = (min_errors - low) / (high - low) if high > low else np.zeros_like(min_errors)
+    colors = np.column_stack((normalized, 1.0 - normalized, np.zeros(count), np.ones(count)))
+
+    heatmap = mesh.color_attributes.new("heatmap", 'FLOAT_COLOR', 'CORNER')
+    heatmap.data.foreach_set('color', np.repeat(colors, 4, axis=0).ravel().astype(np.float32))
+    mesh.color_attributes.active_color = heatmap
+    return mesh
+
+
+def build_cell_mesh(name, origins, grid_shape, bounds_min, bounds_max, fill=1.0):
+    '''One horizontal quad per cell center in origins, covering fill of the cell, built with foreach_set.'''
+    cell_size = (np.asarray(bounds_max) - np.asarray(bounds_min)) / np.asarray(grid_shape)
+    half_x, half_y = cell_size[:2] * fill / 2.0
+
+    offsets = np.array([[-half_x, -half_y, 0.0], [half_x, -half_y, 0.0], [half_x, half_y, 0.0], [-half_x, half_y, 0.0]])
+    co = (origins[:, np.newaxis, :] + offsets[np.newaxis, :, :]).reshape(-1, 3)
+    count = len(origins)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(count * 4)
+    mesh.vertices.foreach_set('co', co.ravel().astype(np.float32))
+    mesh.loops.add(count * 4)
+    mesh.loops.foreach_set('vertex_index', np.arange(count * 4, dtype=np.int32))
+    mesh.polygons.add(count)
+    mesh.polygons.foreach_set('loop_start', np.arange(0, count * 4, 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh